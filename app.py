@@ -1,25 +1,158 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import MetaData, Table, Column, Integer, Float, select, text, insert, update, delete, func, case, inspect, tuple_, literal, event, or_
+from sqlalchemy.orm import joinedload
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from itsdangerous import URLSafeTimedSerializer, BadSignature
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import json
-import math # Import the math module for distance calculations
+import math
+import re
+import struct
+import click
+import gzip
+import io
+import hashlib
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlsplit, urlencode
 
 # Import our design pattern implementations
 from models.user import UserFactory, GeneralUser, ServiceProvider, SystemAdmin
 from models.service import ServiceRegistry, Service
-from models.search import SearchService, CategorySearch, LocationSearch
+from models.search import SearchService, CategorySearch, LocationSearch, build_fts_match
 from models.facade import UserInterfaceFacade
-from models.observer import NotificationService, UserObserver
+from models.observer import NotificationService, UserObserver, EmailNotificationObserver, SMSNotificationObserver
+from models.outbox import OutboxWorker
+from models.realtime import NotificationHub
+from models.geo import bounding_box, haversine_distance
+from models.clustering import ClusterIndex
+from models.cache import ResponseCache, LocalLRUCache
+from models.migrations import MigrationRunner
+from models.exporter import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, EXPORT_WRITERS, encode_chunks
+from models.importer import read_records, validate_service, chunked, ImportReport, ImportRowError, IMPORT_FORMATS
+from models.suggest import SuggestIndex
+from models.hours import parse_hours, minute_of_week, HoursFormatError, MINUTES_PER_DAY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///services.db'
+# DATABASE_URL points the app at another database (the tests use a throwaway one)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///services.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Bulk service imports: rows per insert batch (one admin notification each), coordinate
+# tolerance in degrees for treating a same-named listing as a duplicate, rejects listed in reports
+app.config['IMPORT_BATCH_SIZE'] = 1000
+app.config['IMPORT_DUPLICATE_TOLERANCE'] = 0.00001
+app.config['IMPORT_MAX_REPORTED_REJECTS'] = 100
+# Bulk exports: rows fetched from the database cursor and written per chunk, gzip level
+app.config['EXPORT_CHUNK_SIZE'] = 1000
+app.config['EXPORT_GZIP_LEVEL'] = 6
+# Schema migrations: rows per backfill batch, and seconds to pause between batches so a
+# live application's writes get the database lock in between
+app.config['MIGRATION_BATCH_SIZE'] = 1000
+app.config['MIGRATION_BATCH_PAUSE'] = 0.0
+# SQLite tuning applied to every new connection (a key of SQLITE_PROFILES below)
+app.config['SQLITE_PROFILE'] = 'production'
+app.config['REVIEWS_PER_PAGE'] = 10
+app.config['MAX_REVIEWS_PER_PAGE'] = 50
+app.config['ADMIN_TABLE_PAGE_SIZE'] = 25
+app.config['MAX_ADMIN_TABLE_PAGE_SIZE'] = 100
+app.config['PROVIDER_TABLE_PAGE_SIZE'] = 25
+app.config['API_SERVICES_MAX_LIMIT'] = 1000
+# Viewport queries: default and hard maximum number of services returned
+app.config['BBOX_RESULT_LIMIT'] = 500
+app.config['BBOX_MAX_RESULT_LIMIT'] = 2000
+# Map clustering: deepest zoom level pre-aggregated and grid cell width in pixels
+app.config['CLUSTER_MAX_ZOOM'] = 16
+app.config['CLUSTER_CELL_SIZE'] = 64
+app.config['CLUSTER_MAX_CELLS'] = 4096  # Viewports spanning more cells are clustered at a coarser zoom
+# Typeahead suggestions: default and maximum suggestions per kind, and index keys scanned per lookup
+app.config['SUGGEST_LIMIT'] = 5
+app.config['SUGGEST_MAX_LIMIT'] = 10
+app.config['SUGGEST_MAX_SCAN'] = 2000
+# Distance bands (km) offered as facets when a search includes the user's location
+app.config['SEARCH_DISTANCE_BANDS'] = [1, 5, 10, 25, 50]
+# Time zone of the services' opening hours for "open now" searches (None: the server's local time)
+app.config['SERVICE_HOURS_TIMEZONE'] = None
+# Notification outbox: run the worker thread inside the web process, or set this
+# to False and run `flask drain-outbox` as a separate worker process
+app.config['OUTBOX_WORKER_IN_PROCESS'] = True
+app.config['OUTBOX_POLL_INTERVAL'] = 2.0
+app.config['OUTBOX_BATCH_SIZE'] = 200
+app.config['OUTBOX_MAX_ATTEMPTS'] = 5
+# Seconds a drainer owns the events it claimed; unfinished ones are then retried by others
+app.config['OUTBOX_CLAIM_TIMEOUT'] = 300
+# External delivery channels fed by the outbox worker ('email', 'sms')
+app.config['NOTIFICATION_CHANNELS'] = []
+# Live notification stream (Server-Sent Events served from its own event loop and port).
+# The stream speaks plain HTTP; NOTIFICATION_STREAM_URL overrides the public URL, e.g. an
+# https:// location on a reverse proxy in front of it when the site is served over HTTPS.
+# New notifications are picked up by polling, so they stream whichever process created them.
+app.config['NOTIFICATION_STREAM_ENABLED'] = True
+app.config['NOTIFICATION_STREAM_HOST'] = '127.0.0.1'
+app.config['NOTIFICATION_STREAM_PORT'] = 5002
+app.config['NOTIFICATION_STREAM_URL'] = None
+app.config['NOTIFICATION_STREAM_POLL_INTERVAL'] = 1.0
+app.config['NOTIFICATION_STREAM_TOKEN_MAX_AGE'] = 3600
+# Seconds an unread notification count may be served from cache. Writes in this process
+# invalidate it immediately; the TTL bounds staleness from writers in other processes.
+app.config['UNREAD_COUNT_CACHE_TTL'] = 30
+# Per-process read models (service registry, map clusters, suggestions) follow writes made
+# by other processes (web workers, CLI imports) through the service_change log, checked at
+# most every READ_MODEL_SYNC_INTERVAL seconds. More changed services than
+# READ_MODEL_MAX_INCREMENTAL reload the models instead; the log keeps about
+# READ_MODEL_CHANGE_LOG_SIZE entries
+app.config['READ_MODEL_SYNC_INTERVAL'] = 5.0
+app.config['READ_MODEL_MAX_INCREMENTAL'] = 500
+app.config['READ_MODEL_CHANGE_LOG_SIZE'] = 10000
+# Server-side cache for public search/API responses, invalidated by a catalogue version that every
+# service write bumps. The version is per process; writes of other processes bump it when the read
+# model sync applies them, and the TTL bounds staleness in between.
+app.config['RESPONSE_CACHE_ENABLED'] = True
+app.config['RESPONSE_CACHE_BACKEND'] = 'local'
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = 1024
+app.config['RESPONSE_CACHE_TTL'] = 60
+app.config['RESPONSE_CACHE_MAX_BODY_SIZE'] = 1024 * 1024
+# HTTP caching for the public JSON endpoints: max-age sent to clients, the body size
+# from which responses are compressed when the client accepts it, and the gzip level
+# (encoded bodies are cached, so a higher level costs CPU once per cached response)
+app.config['JSON_CACHE_MAX_AGE'] = 60
+app.config['COMPRESSION_MIN_SIZE'] = 1024
+app.config['RESPONSE_GZIP_LEVEL'] = 6
 
 db = SQLAlchemy(app)
+
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'busy_timeout': 5000,  # ms a writer waits for the lock instead of failing at once
+        'journal_mode': 'WAL',  # readers no longer block behind a write, nor it behind them
+        'synchronous': 'NORMAL',  # fsync at checkpoints only; still crash-safe in WAL mode
+        'cache_size': -65536,  # page cache per connection, in KiB when negative
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY'
+    }
+}
+
+def apply_sqlite_profile(dbapi_connection, connection_record):
+    """Set the configured profile's pragmas on a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PROFILES[app.config['SQLITE_PROFILE']].items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', apply_sqlite_profile)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -27,8 +160,70 @@ login_manager.login_view = 'login'
 # Initialize design pattern instances
 service_registry = ServiceRegistry.get_instance()
 notification_service = NotificationService()
+NOTIFICATION_CHANNEL_OBSERVERS = {'email': EmailNotificationObserver, 'sms': SMSNotificationObserver}
+for channel in app.config['NOTIFICATION_CHANNELS']:
+    notification_service.add_observer(NOTIFICATION_CHANNEL_OBSERVERS[channel]())
+
+# Signed, expiring tokens authenticate browsers to the notification stream
+stream_token_serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='notification-stream')
+
+def authenticate_stream_token(token):
+    try:
+        return stream_token_serializer.loads(token, max_age=app.config['NOTIFICATION_STREAM_TOKEN_MAX_AGE'])
+    except BadSignature:
+        return None
+
+def fetch_stream_notifications(after_id, user_ids):
+    """
+    Find the notifications to stream since the last poll of the hub
+
+    Args:
+        after_id (int): Highest notification ID already seen (None on the first poll)
+        user_ids: Users with an open stream
+
+    Returns:
+        tuple: (new highest notification ID, event dicts for user_ids in ID order)
+    """
+    with app.app_context():
+        high_water = db.session.scalar(select(func.max(Notification.id))) or 0
+        if after_id is None or not user_ids or high_water <= after_id:
+            return high_water, []
+        rows = db.session.execute(
+            select(Notification.id, Notification.user_id, Notification.message, Notification.url,
+                   Notification.created_at).where(
+                Notification.id > after_id, Notification.id <= high_water, Notification.user_id.in_(user_ids)
+            ).order_by(Notification.id)
+        ).all()
+        return high_water, [notification_event(row) for row in rows]
+
+# Subject for in-app notifications once they are committed; the hub streams them to browsers
+live_notifications = NotificationService()
+notification_hub = NotificationHub(
+    authenticate_stream_token,
+    fetch_stream_notifications,
+    host=app.config['NOTIFICATION_STREAM_HOST'],
+    port=app.config['NOTIFICATION_STREAM_PORT'],
+    poll_interval=app.config['NOTIFICATION_STREAM_POLL_INTERVAL']
+)
+live_notifications.add_observer(notification_hub)
 user_interface_facade = UserInterfaceFacade(service_registry, notification_service)
 
+# Per-zoom grid clusters of publicly visible services for the maps
+cluster_index = ClusterIndex(max_zoom=app.config['CLUSTER_MAX_ZOOM'], cell_size=app.config['CLUSTER_CELL_SIZE'],
+                             max_cells=app.config['CLUSTER_MAX_CELLS'])
+# Prefix index of public service names, categories and localities for search suggestions
+suggest_index = SuggestIndex(max_scan=app.config['SUGGEST_MAX_SCAN'])
+
+RESPONSE_CACHE_BACKENDS = {'local': LocalLRUCache}
+# Content encodings offered to clients, most preferred first (brotli only if installed)
+RESPONSE_ENCODERS = {'gzip': lambda body: gzip.compress(body, compresslevel=app.config['RESPONSE_GZIP_LEVEL'])}
+if brotli is not None:
+    RESPONSE_ENCODERS = {'br': brotli.compress, **RESPONSE_ENCODERS}
+response_cache = ResponseCache(RESPONSE_CACHE_BACKENDS[app.config['RESPONSE_CACHE_BACKEND']](
+    max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+    ttl=app.config['RESPONSE_CACHE_TTL']
+))
+
 # Database Models
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -37,6 +232,9 @@ class User(db.Model, UserMixin):
     password_hash = db.Column(db.String(120), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # general, provider, admin
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Role fan-out of notifications and the admin provider table
+    __table_args__ = (db.Index('ix_user_role', 'role'),)
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -56,6 +254,9 @@ class ServiceModel(db.Model):
     email = db.Column(db.String(120))
     hours = db.Column(db.String(200))
     rating = db.Column(db.Float, default=0.0)
+    # Running review aggregates; rating is kept equal to rating_sum / review_count
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     provider_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     is_approved = db.Column(db.Boolean, default=False)
     is_rejected = db.Column(db.Boolean, default=False)
@@ -71,6 +272,25 @@ class ServiceModel(db.Model):
     provider = db.relationship('User', foreign_keys=[provider_id], backref='services')
     hold_admin = db.relationship('User', foreign_keys=[held_by], backref='held_services')
 
+    # Serve the public listings (visibility, then category and rating filters), provider
+    # dashboards, and the duplicate check of bulk imports
+    __table_args__ = (
+        db.Index('ix_service_model_visibility', 'is_approved', 'is_held', 'category', 'rating'),
+        db.Index('ix_service_model_provider_created', 'provider_id', 'created_at'),
+        db.Index('ix_service_model_location', 'latitude', 'longitude')
+    )
+
+class ServiceHours(db.Model):
+    """A weekly opening interval of a service, parsed from ServiceModel.hours"""
+    __tablename__ = 'service_hours'
+    service_id = db.Column(db.Integer, db.ForeignKey('service_model.id'), primary_key=True)
+    # Minutes from Monday 00:00; an interval never crosses midnight, so closes - opens <= one day
+    opens = db.Column(db.Integer, primary_key=True)
+    closes = db.Column(db.Integer, nullable=False)
+
+    # Covering index for "which services are open at minute m" range lookups
+    __table_args__ = (db.Index('ix_service_hours_opens', 'opens', 'closes', 'service_id'),)
+
 class Review(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     service_id = db.Column(db.Integer, db.ForeignKey('service_model.id'))
@@ -85,16 +305,700 @@ class Review(db.Model):
     service = db.relationship('ServiceModel', backref='reviews')
     user = db.relationship('User', backref='reviews')
 
+    # Serve the newest-first review pages of a service and the reviews of a user
+    __table_args__ = (
+        db.Index('ix_review_service_created', 'service_id', 'created_at', 'id'),
+        db.Index('ix_review_user', 'user_id')
+    )
+
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     message = db.Column(db.String(255), nullable=False)
     url = db.Column(db.String(255))
+    service_id = db.Column(db.Integer, db.ForeignKey('service_model.id'))  # service the notification is about
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     user = db.relationship('User', backref=db.backref('notifications', passive_deletes=True))
 
+    # Serve the per-user newest-first listings and unread counts, and per-service counts
+    __table_args__ = (
+        db.Index('ix_notification_user_created', 'user_id', 'created_at'),
+        db.Index('ix_notification_user_service', 'user_id', 'service_id')
+    )
+
+class NotificationOutbox(db.Model):
+    """Notification events committed with a state change, waiting for the outbox worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer)  # explicit recipient, or
+    recipient_role = db.Column(db.String(20))  # every user with this role
+    message = db.Column(db.String(255), nullable=False)
+    url = db.Column(db.String(255))
+    service_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # retry backoff
+    last_error = db.Column(db.Text)
+
+    __table_args__ = (db.Index('ix_notification_outbox_pending', 'available_at', 'attempts'),)
+
+class ServiceChange(db.Model):
+    """A service inserted, updated or deleted, logged by triggers for other processes' read models"""
+    __tablename__ = 'service_change'
+    seq = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, nullable=False)
+
+    # AUTOINCREMENT: sequence numbers are never reused after old entries are pruned
+    __table_args__ = {'sqlite_autoincrement': True}
+
+SERVICE_CHANGE_LOG_DDL = [
+    """CREATE TRIGGER IF NOT EXISTS service_change_insert AFTER INSERT ON service_model
+       BEGIN
+           INSERT INTO service_change (service_id) VALUES (new.id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS service_change_update AFTER UPDATE ON service_model
+       BEGIN
+           INSERT INTO service_change (service_id) VALUES (new.id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS service_change_delete AFTER DELETE ON service_model
+       BEGIN
+           INSERT INTO service_change (service_id) VALUES (old.id);
+       END"""
+]
+
+# SQLite virtual tables live outside db.metadata so db.create_all() leaves them alone;
+# a migration creates them together with the triggers that keep them in sync
+virtual_metadata = MetaData()
+
+# R*Tree spatial index over service coordinates (one degenerate box per service)
+service_rtree = Table(
+    'service_rtree', virtual_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('min_lat', Float),
+    Column('max_lat', Float),
+    Column('min_lng', Float),
+    Column('max_lng', Float)
+)
+
+SPATIAL_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS service_rtree
+       USING rtree(id, min_lat, max_lat, min_lng, max_lng)""",
+    """CREATE TRIGGER IF NOT EXISTS service_rtree_insert AFTER INSERT ON service_model
+       WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+       BEGIN
+           INSERT INTO service_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS service_rtree_update AFTER UPDATE OF latitude, longitude ON service_model
+       BEGIN
+           DELETE FROM service_rtree WHERE id = old.id;
+           INSERT INTO service_rtree
+               SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+               WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS service_rtree_delete AFTER DELETE ON service_model
+       BEGIN
+           DELETE FROM service_rtree WHERE id = old.id;
+       END""",
+    # Backfill rows created before the index existed
+    """INSERT INTO service_rtree
+       SELECT id, latitude, latitude, longitude, longitude FROM service_model
+       WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+         AND id NOT IN (SELECT id FROM service_rtree)"""
+]
+
+# FTS5 index over the searchable text columns, reading its content from service_model.
+# prefix='2 3' adds prefix indexes so typeahead-style 'term*' queries stay cheap.
+FULL_TEXT_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS service_fts
+       USING fts5(name, description, address, content='service_model', content_rowid='id',
+                  tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS service_fts_insert AFTER INSERT ON service_model
+       BEGIN
+           INSERT INTO service_fts(rowid, name, description, address)
+           VALUES (new.id, new.name, new.description, new.address);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS service_fts_update AFTER UPDATE OF name, description, address ON service_model
+       BEGIN
+           INSERT INTO service_fts(service_fts, rowid, name, description, address)
+           VALUES ('delete', old.id, old.name, old.description, old.address);
+           INSERT INTO service_fts(rowid, name, description, address)
+           VALUES (new.id, new.name, new.description, new.address);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS service_fts_delete AFTER DELETE ON service_model
+       BEGIN
+           INSERT INTO service_fts(service_fts, rowid, name, description, address)
+           VALUES ('delete', old.id, old.name, old.description, old.address);
+       END"""
+]
+
+# Column weights for bm25(): a hit in the name outranks one in the address or description
+FTS_RANK_EXPRESSION = 'bm25(service_fts, 10.0, 1.0, 2.0)'
+
+def add_column(connection, column):
+    """
+    Add a model column to its table unless the table already has it
+
+    Returns:
+        bool: Whether the column was added
+    """
+    existing = {info['name'] for info in inspect(connection).get_columns(column.table.name)}
+    if column.name in existing:
+        return False
+    column_type = column.type.compile(dialect=connection.dialect)
+    default = f" NOT NULL DEFAULT {column.server_default.arg}" if column.server_default is not None else ''
+    connection.exec_driver_sql(f'ALTER TABLE "{column.table.name}" ADD COLUMN "{column.name}" {column_type}{default}')
+    return True
+
+def create_indexes(connection, *names):
+    """Create model indexes by name unless they exist (IF NOT EXISTS, so concurrent runners are safe)"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(connection, checkfirst=True)
+
+def backfill_id_range(connection, column, position, batch_size, backfill):
+    """
+    Run one migration backfill batch over the rows with IDs in (position, position + batch_size]
+
+    Args:
+        column: ID column the batches range over
+        backfill: Function taking row criteria and a connection keyword
+
+    Returns:
+        int: Next position, or None once past the highest ID
+    """
+    upper = position + batch_size
+    backfill(column > position, column <= upper, connection=connection)
+    last_id = connection.execute(select(func.max(column))).scalar()
+    return upper if last_id is not None and last_id > upper else None
+
+# Ordered schema changes. Each upgrade is idempotent so it also brings databases created
+# before versioning up to date; new schema changes are added as new versions at the end.
+schema_migrations = MigrationRunner()
+
+@schema_migrations.migration(1, 'Create the application tables')
+def create_tables(connection):
+    db.metadata.create_all(connection)
+
+@schema_migrations.migration(2, 'Add running review aggregates to services')
+def add_review_aggregates(connection):
+    add_column(connection, ServiceModel.__table__.c.review_count)
+    add_column(connection, ServiceModel.__table__.c.rating_sum)
+
+@schema_migrations.backfill(2)
+def backfill_review_aggregates(connection, position, batch_size):
+    return backfill_id_range(connection, ServiceModel.id, position, batch_size, reconcile_rating_aggregates)
+
+@schema_migrations.migration(3, 'Add the spatial and full-text search indexes')
+def add_search_indexes(connection):
+    fts_exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'service_fts'"
+    ).first()
+    for statement in SPATIAL_INDEX_DDL + FULL_TEXT_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    if not fts_exists:
+        # Index rows created before the full-text table existed
+        connection.exec_driver_sql("INSERT INTO service_fts(service_fts) VALUES ('rebuild')")
+
+@schema_migrations.migration(4, 'Link notifications to their service and index them per user')
+def add_notification_services(connection):
+    add_column(connection, Notification.__table__.c.service_id)
+    add_column(connection, NotificationOutbox.__table__.c.service_id)
+    create_indexes(connection, 'ix_notification_user_created', 'ix_notification_user_service',
+                   'ix_notification_outbox_pending')
+
+@schema_migrations.backfill(4)
+def backfill_notification_service_ids(connection, position, batch_size):
+    return backfill_id_range(connection, Notification.id, position, batch_size, backfill_notification_services)
+
+@schema_migrations.migration(5, 'Index opening hours')
+def add_service_hours(connection):
+    ServiceHours.__table__.create(connection, checkfirst=True)
+    create_indexes(connection, 'ix_service_hours_opens')
+
+@schema_migrations.backfill(5)
+def backfill_opening_hours(connection, position, batch_size):
+    return backfill_id_range(connection, ServiceModel.id, position, batch_size, backfill_service_hours)
+
+@schema_migrations.migration(6, 'Add secondary indexes for listings, reviews and roles')
+def add_secondary_indexes(connection):
+    create_indexes(connection, 'ix_service_model_visibility', 'ix_service_model_provider_created',
+                   'ix_review_service_created', 'ix_review_user', 'ix_user_role')
+
+@schema_migrations.migration(7, 'Index service coordinates for import duplicate checks')
+def add_location_index(connection):
+    create_indexes(connection, 'ix_service_model_location')
+
+@schema_migrations.migration(8, 'Re-parse opening hours with bare ranges as 12-hour time')
+def reparse_opening_hours(connection):
+    pass
+
+@schema_migrations.backfill(8)
+def backfill_reparsed_opening_hours(connection, position, batch_size):
+    return backfill_id_range(connection, ServiceModel.id, position, batch_size, backfill_service_hours)
+
+@schema_migrations.migration(9, 'Log service changes for the read models of other processes')
+def add_service_change_log(connection):
+    ServiceChange.__table__.create(connection, checkfirst=True)
+    for statement in SERVICE_CHANGE_LOG_DDL:
+        connection.exec_driver_sql(statement)
+
+def init_database():
+    """Bring the database schema up to date by applying any pending migrations"""
+    schema_migrations.upgrade(
+        db.engine, batch_size=app.config['MIGRATION_BATCH_SIZE'], pause=app.config['MIGRATION_BATCH_PAUSE']
+    )
+
+def backfill_notification_services(*criteria, connection=None):
+    """
+    Link notifications created before Notification.service_id existed to their service via the URL
+
+    Args:
+        criteria: Further conditions on the notifications to backfill
+        connection: Connection to run on (default: the session)
+    """
+    executor = connection if connection is not None else db.session
+    service_url = re.compile(r'^/service/(\d+)(?:[#?]|$)')
+    rows = []
+    for notification_id, url in executor.execute(
+        select(Notification.id, Notification.url).where(Notification.url.like('/service/%'), *criteria)
+    ):
+        match = service_url.match(url)
+        if match:
+            rows.append({'notification_id': notification_id, 'service_id': int(match.group(1))})
+    if rows:
+        executor.execute(
+            text('UPDATE notification SET service_id = :service_id WHERE id = :notification_id'), rows
+        )
+
+def sync_service_hours(service):
+    """
+    Replace a service's opening intervals with those parsed from its hours text
+
+    Returns:
+        bool: False if the text is set but not understood (the service then
+              never matches open-now searches)
+    """
+    ServiceHours.query.filter_by(service_id=service.id).delete()
+    try:
+        intervals = parse_hours(service.hours)
+    except HoursFormatError:
+        return not (service.hours or '').strip()
+    if intervals:
+        db.session.execute(insert(ServiceHours), [
+            {'service_id': service.id, 'opens': opens, 'closes': closes} for opens, closes in intervals
+        ])
+    return True
+
+def backfill_service_hours(*criteria, connection=None):
+    """
+    Rebuild the opening intervals from the services' hours text
+
+    Args:
+        criteria: Conditions on the services to rebuild (default: all)
+        connection: Connection to run on (default: the session)
+
+    Returns:
+        list: (service_id, hours) of services whose hours were not understood
+    """
+    executor = connection if connection is not None else db.session
+    rebuilt = ServiceHours.__table__.delete()
+    if criteria:
+        rebuilt = rebuilt.where(ServiceHours.service_id.in_(select(ServiceModel.id).where(*criteria)))
+    executor.execute(rebuilt)
+    rows = []
+    unrecognized = []
+    for service_id, hours in executor.execute(
+        select(ServiceModel.id, ServiceModel.hours).where(ServiceModel.hours.isnot(None), *criteria)
+    ):
+        try:
+            rows.extend(
+                {'service_id': service_id, 'opens': opens, 'closes': closes} for opens, closes in parse_hours(hours)
+            )
+        except HoursFormatError:
+            if hours.strip():
+                unrecognized.append((service_id, hours))
+    if rows:
+        executor.execute(insert(ServiceHours), rows)
+    return unrecognized
+
+def current_hours_minute():
+    """Current minute of the week in the services' time zone"""
+    zone = app.config['SERVICE_HOURS_TIMEZONE']
+    return minute_of_week(datetime.now(ZoneInfo(zone)) if zone else datetime.now())
+
+def filter_open_at(query, minute):
+    """
+    Restrict a ServiceModel query to services open at a minute of the week
+
+    Intervals never span more than a day, so only those opening within the
+    preceding day can contain the minute: a bounded range scan of the
+    covering index instead of parsing every service's hours text.
+    """
+    open_services = select(ServiceHours.service_id).where(
+        ServiceHours.opens.between(minute - MINUTES_PER_DAY + 1, minute),
+        ServiceHours.closes > minute
+    )
+    return query.filter(ServiceModel.id.in_(open_services))
+
+def filter_within_radius(query, lat, lon, radius_km):
+    """
+    Restrict a ServiceModel query to the bounding box of a search circle
+
+    The box lookup is answered by the R*Tree index, so only nearby candidates
+    are loaded; callers still apply the exact haversine check to the results.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    return filter_within_bbox(query, min_lat, max_lat, min_lon, max_lon)
+
+def filter_within_bbox(query, min_lat, max_lat, min_lng, max_lng):
+    """
+    Restrict a ServiceModel query or select to a lat/lng rectangle via the R*Tree index
+    
+    The index is joined rather than used in an IN subquery, so rows stream
+    from the R*Tree scan and a LIMIT stops it early. The "+ 0" keeps SQLite
+    from probing the R*Tree by ID instead: without it the planner prefers
+    walking the visibility index over every public service and looking each
+    one up in the R*Tree. A rectangle with min_lng > max_lng crosses the
+    antimeridian; its longitude test is then applied to the latitude band
+    the index returns.
+    """
+    query = query.join(service_rtree, service_rtree.c.id + 0 == ServiceModel.id).filter(
+        service_rtree.c.max_lat >= min_lat,
+        service_rtree.c.min_lat <= max_lat
+    )
+    if min_lng > max_lng:
+        return query.filter(or_(service_rtree.c.max_lng >= min_lng, service_rtree.c.min_lng <= max_lng))
+    return query.filter(service_rtree.c.max_lng >= min_lng, service_rtree.c.min_lng <= max_lng)
+
+def filter_by_keywords(query, keywords):
+    """
+    Restrict a ServiceModel query to full-text matches, best BM25 rank first
+
+    Each word in keywords is matched as a prefix against name, description
+    and address through the service_fts index.
+    """
+    match = build_fts_match(keywords)
+    if not match:
+        return query.filter(db.false())
+
+    matches = text(
+        f"SELECT rowid AS id, {FTS_RANK_EXPRESSION} AS rank FROM service_fts WHERE service_fts MATCH :match"
+    ).bindparams(match=match).columns(id=Integer, rank=Float).subquery('fts_matches')
+    return query.join(matches, ServiceModel.id == matches.c.id).order_by(matches.c.rank)
+
+def average_rating(review_count, rating_sum):
+    """SQL expression for the average rating given count and sum expressions"""
+    return case((review_count > 0, func.cast(rating_sum, Float) / review_count), else_=0.0)
+
+def add_review_to_aggregates(service_id, rating):
+    """Count one new review in its service's aggregates inside the current transaction"""
+    review_count = ServiceModel.review_count + 1
+    rating_sum = ServiceModel.rating_sum + rating
+    db.session.execute(
+        update(ServiceModel).where(ServiceModel.id == service_id).values(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating=average_rating(review_count, rating_sum)
+        )
+    )
+
+def subtract_reviews_from_aggregates(*criteria):
+    """
+    Take the reviews matching criteria out of their services' aggregates
+
+    Runs as one set-based UPDATE in the current transaction, before the
+    reviews themselves are deleted.
+
+    Returns:
+        list: IDs of the services whose aggregates changed
+    """
+    service_ids = db.session.scalars(select(Review.service_id).where(*criteria).distinct()).all()
+    removed = select(Review).where(Review.service_id == ServiceModel.id, *criteria)
+    review_count = ServiceModel.review_count - removed.with_only_columns(func.count(Review.id)).scalar_subquery()
+    rating_sum = ServiceModel.rating_sum - removed.with_only_columns(
+        func.coalesce(func.sum(Review.rating), 0)
+    ).scalar_subquery()
+    db.session.execute(
+        update(ServiceModel).where(ServiceModel.id.in_(service_ids)).values(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating=average_rating(review_count, rating_sum)
+        )
+    )
+    return service_ids
+
+def reconcile_rating_aggregates(*criteria, connection=None):
+    """
+    Recompute review aggregates from the review table wherever they drifted
+
+    Args:
+        criteria: Conditions on the services to check (default: all)
+        connection: Connection to run on (default: the session)
+
+    Returns:
+        int: Number of services that were corrected
+    """
+    review_count = select(func.count(Review.id)).where(Review.service_id == ServiceModel.id).scalar_subquery()
+    rating_sum = select(func.coalesce(func.sum(Review.rating), 0)).where(
+        Review.service_id == ServiceModel.id
+    ).scalar_subquery()
+    result = (connection if connection is not None else db.session).execute(
+        update(ServiceModel).where(
+            *criteria,
+            (ServiceModel.review_count != review_count) |
+            (ServiceModel.rating_sum != rating_sum) |
+            (ServiceModel.rating.is_distinct_from(average_rating(review_count, rating_sum)))
+        ).values(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating=average_rating(review_count, rating_sum)
+        )
+    )
+    return result.rowcount
+
+def encode_review_cursor(review):
+    """Build the opaque keyset cursor pointing just past a review"""
+    return f"{review.created_at.isoformat()}_{review.id}"
+
+def decode_review_cursor(cursor):
+    """Parse a review cursor into a (created_at, id) tuple, raising ValueError if malformed"""
+    created_at, _, review_id = cursor.rpartition('_')
+    return datetime.fromisoformat(created_at), int(review_id)
+
+def load_review_page(service_id, cursor=None, limit=None):
+    """
+    Load one page of a service's reviews, newest first, with their authors
+
+    Pages are keyed on (created_at, id) instead of an OFFSET, so every page
+    costs the same however far the reader has scrolled.
+
+    Returns:
+        tuple: (reviews, next_cursor) where next_cursor is None on the last page
+    """
+    limit = limit or app.config['REVIEWS_PER_PAGE']
+    query = Review.query.options(joinedload(Review.user)).filter_by(service_id=service_id)
+    if cursor is not None:
+        query = query.filter(tuple_(Review.created_at, Review.id) < cursor)
+    reviews = query.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        next_cursor = encode_review_cursor(reviews[-1])
+    return reviews, next_cursor
+
+def can_view_service(service):
+    """Check whether the current user may see a service that might not be approved yet"""
+    if service.is_approved:
+        return True
+    if not current_user.is_authenticated:
+        return False
+    return current_user.role == 'admin' or (current_user.role == 'provider' and service.provider_id == current_user.id)
+
+def filter_by_ids(query, ids):
+    """Restrict a ServiceModel query to a list of ids passed as one JSON parameter"""
+    id_list = text("SELECT value FROM json_each(:ids)").bindparams(ids=json.dumps(list(ids)))
+    return query.filter(ServiceModel.id.in_(id_list.columns(value=Integer)))
+
+def is_publicly_visible(service):
+    """Check whether a service is shown to general users and anonymous visitors"""
+    return bool(service.is_approved) and not service.is_held
+
+# Position in the service_change log up to which this process's read models are current
+read_model_sync = {'seen': 0, 'next_check': 0.0, 'lock': threading.Lock()}
+
+def load_service_indexes():
+    """Hydrate the in-memory read models from the database"""
+    # Read the log position first: changes committed during the load are applied again later
+    seen = db.session.scalar(select(func.max(ServiceChange.seq))) or 0
+    service_registry.load(Service.from_record(service) for service in ServiceModel.query.yield_per(1000))
+    points = db.session.query(
+        ServiceModel.id, ServiceModel.latitude, ServiceModel.longitude, ServiceModel.category
+    ).filter_by(is_approved=True, is_held=False).filter(
+        ServiceModel.latitude.isnot(None), ServiceModel.longitude.isnot(None)
+    ).all()
+    cluster_index.load(points)
+    suggest_index.load(db.session.execute(
+        select(ServiceModel.id, ServiceModel.name, ServiceModel.category, ServiceModel.address, ServiceModel.review_count)
+        .where(ServiceModel.is_approved == True, ServiceModel.is_held == False)
+    ))
+    read_model_sync['seen'] = seen
+    read_model_sync['next_check'] = time.monotonic() + app.config['READ_MODEL_SYNC_INTERVAL']
+
+def refresh_service_indexes(service):
+    """Apply a committed change to a service to the in-memory read models"""
+    response_cache.bump_version()
+    service_registry.upsert_service(Service.from_record(service))
+    if is_publicly_visible(service):
+        suggest_index.upsert(service.id, service.name, service.category, service.address, service.review_count)
+    else:
+        suggest_index.remove(service.id)
+    if is_publicly_visible(service) and service.latitude is not None and service.longitude is not None:
+        cluster_index.upsert(service.id, service.latitude, service.longitude, service.category)
+    else:
+        cluster_index.remove(service.id)
+
+def remove_from_service_indexes(service_ids):
+    """Drop deleted services from the in-memory read models"""
+    response_cache.bump_version()
+    for service_id in service_ids:
+        service_registry.remove_service(service_id)
+        cluster_index.remove(service_id)
+        suggest_index.remove(service_id)
+
+def sync_service_indexes(force=False):
+    """
+    Bring the in-memory read models up to date with changes made by any process
+
+    Services logged in service_change since the last sync are re-read and
+    applied like local writes (this process's own writes come back too,
+    which is harmless). Too many changes, or a log pruned past this
+    process's position, reload the models instead. Runs at most every
+    READ_MODEL_SYNC_INTERVAL seconds unless forced, and in one request
+    thread at a time.
+
+    Args:
+        force (bool): Check now, waiting for a sync in another thread to finish
+    """
+    if not cluster_index.is_loaded:
+        return
+    if not force and time.monotonic() < read_model_sync['next_check']:
+        return
+    if not read_model_sync['lock'].acquire(blocking=force):
+        return
+    try:
+        read_model_sync['next_check'] = time.monotonic() + app.config['READ_MODEL_SYNC_INTERVAL']
+        seen = read_model_sync['seen']
+        oldest, latest = db.session.execute(select(func.min(ServiceChange.seq), func.max(ServiceChange.seq))).one()
+        if latest is None or latest <= seen:
+            return
+        max_incremental = app.config['READ_MODEL_MAX_INCREMENTAL']
+        changed_ids = db.session.scalars(
+            select(ServiceChange.service_id).where(ServiceChange.seq > seen, ServiceChange.seq <= latest)
+            .distinct().limit(max_incremental + 1)
+        ).all()
+        if oldest > seen + 1 or len(changed_ids) > max_incremental:
+            load_service_indexes()
+        else:
+            services = filter_by_ids(ServiceModel.query, changed_ids).all()
+            for service in services:
+                refresh_service_indexes(service)
+            remove_from_service_indexes(set(changed_ids) - {service.id for service in services})
+            read_model_sync['seen'] = latest
+
+        log_size = app.config['READ_MODEL_CHANGE_LOG_SIZE']
+        if latest - oldest >= 2 * log_size:
+            db.session.execute(delete(ServiceChange).where(ServiceChange.seq <= latest - log_size))
+            db.session.commit()
+    finally:
+        read_model_sync['lock'].release()
+
+def response_role_class():
+    """Group users whose search results are identical: 'staff' also sees unapproved services"""
+    if current_user.is_authenticated and current_user.role in ['admin', 'provider']:
+        return 'staff'
+    return 'public'
+
+def build_response_entry(response):
+    """
+    Capture a rendered response for the response cache
+    
+    The strong ETag is a digest of the body, so it is computed once per
+    catalogue version rather than per request. Compressed variants are
+    added to 'encoded' the first time a client asks for them.
+    """
+    body = response.get_data()
+    return {
+        'body': body,
+        'status': response.status_code,
+        'mimetype': response.mimetype,
+        'etag': hashlib.sha1(body).hexdigest(),
+        'encoded': {}
+    }
+
+def respond_from_entry(entry, conditional, cache_status):
+    """
+    Build the response for a captured entry
+    
+    With conditional set, the body is compressed with the best encoding the
+    client accepts, tagged with a per-encoding strong ETag and Cache-Control,
+    and answered with 304 Not Modified when If-None-Match matches.
+    """
+    body = entry['body']
+    encoding = None
+    if conditional and len(body) >= app.config['COMPRESSION_MIN_SIZE']:
+        encoding = request.accept_encodings.best_match(list(RESPONSE_ENCODERS))
+    if encoding:
+        encoded = entry['encoded'].get(encoding)
+        if encoded is None:
+            encoded = entry['encoded'][encoding] = RESPONSE_ENCODERS[encoding](body)
+        body = encoded
+    
+    response = app.response_class(body, status=entry['status'], mimetype=entry['mimetype'])
+    response.headers['X-Cache'] = cache_status
+    if not conditional:
+        return response
+    
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{entry['etag']}-{encoding}" if encoding else entry['etag'])
+    response.vary.update(['Accept-Encoding', 'Cookie'])
+    if response_role_class() == 'public':
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    response.cache_control.max_age = app.config['JSON_CACHE_MAX_AGE']
+    return response.make_conditional(request)
+
+def cached_response(personalized=False, conditional=False, extra_key=None):
+    """
+    Serve a read-only view from the response cache
+    
+    Responses are keyed on the path, the query string with blank arguments
+    dropped and the rest sorted, and the role class. Only successful,
+    non-streamed responses are stored.
+    
+    Args:
+        personalized (bool): The page embeds per-user content (navigation,
+            flashed messages), so it is only cached for anonymous visitors
+        conditional (bool): Add ETag, Cache-Control and compression to
+            successful responses (see respond_from_entry)
+        extra_key: Callable returning any further request state the response
+            depends on, added to the cache key (optional)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            use_cache = app.config['RESPONSE_CACHE_ENABLED'] and not (
+                personalized and (current_user.is_authenticated or session.get('_flashes'))
+            )
+            if use_cache:
+                query_string = urlencode(sorted((key, value) for key, value in request.args.items(multi=True) if value))
+                key = (request.path, query_string, response_role_class(), extra_key() if extra_key else None)
+                entry = response_cache.get(key)
+                if entry is not None:
+                    return respond_from_entry(entry, conditional, 'HIT')
+            
+            version = response_cache.version
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed or not (use_cache or conditional):
+                return response
+            entry = build_response_entry(response)
+            if use_cache and len(entry['body']) <= app.config['RESPONSE_CACHE_MAX_BODY_SIZE']:
+                response_cache.set(key, entry, version)
+            return respond_from_entry(entry, conditional, 'MISS' if use_cache else 'BYPASS')
+        return wrapper
+    return decorator
+
+@app.before_request
+def ensure_service_indexes():
+    if not cluster_index.is_loaded:
+        load_service_indexes()
+    else:
+        sync_service_indexes()
+
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
@@ -160,23 +1064,517 @@ def logout():
     logout_user()
     return redirect(url_for('index'))
 
+# Admin dashboard tables: row filter per section and the columns each table can sort by
+ADMIN_SERVICE_FILTERS = {
+    'pending': (ServiceModel.is_approved == False, ServiceModel.is_rejected == False, ServiceModel.is_held == False),
+    'rejected': (ServiceModel.is_rejected == True,),
+    'held': (ServiceModel.is_held == True,),
+    'all': ()
+}
+ADMIN_SERVICE_SORTS = {
+    'name': ServiceModel.name,
+    'category': ServiceModel.category,
+    'created_at': ServiceModel.created_at,
+    'rejected_at': ServiceModel.rejected_at,
+    'held_at': ServiceModel.held_at,
+    'rating': ServiceModel.rating
+}
+ADMIN_PROVIDER_SORTS = {
+    'username': User.username,
+    'email': User.email,
+    'created_at': User.created_at
+}
+
+def service_status_counts(*criteria):
+    """
+    Count services per moderation status with a single GROUP BY query
+    
+    Args:
+        *criteria: Optional filters restricting the services counted
+        
+    Returns:
+        dict: Counts for 'pending', 'approved', 'active' (approved and not held),
+              'rejected', 'held' and 'total'
+    """
+    counts = {'pending': 0, 'approved': 0, 'active': 0, 'rejected': 0, 'held': 0, 'total': 0}
+    rows = db.session.execute(
+        select(ServiceModel.is_approved, ServiceModel.is_rejected, ServiceModel.is_held, func.count())
+        .where(*criteria)
+        .group_by(ServiceModel.is_approved, ServiceModel.is_rejected, ServiceModel.is_held)
+    )
+    # At most eight flag combinations; fold them into the (overlapping) dashboard statuses
+    for is_approved, is_rejected, is_held, count in rows:
+        counts['total'] += count
+        if is_approved:
+            counts['approved'] += count
+            if not is_held:
+                counts['active'] += count
+        if is_rejected:
+            counts['rejected'] += count
+        if is_held:
+            counts['held'] += count
+        if not (is_approved or is_rejected or is_held):
+            counts['pending'] += count
+    return counts
+
+def paginate_admin_table(query, sorts, default_sort, primary_key):
+    """
+    Sort and paginate an admin table query from the request arguments
+    
+    Args:
+        query: Query to paginate
+        sorts (dict): Allowed 'sort' argument values mapped to columns
+        default_sort (str): Sort key used when the argument is missing or unknown
+        primary_key: Column breaking ties so pages never overlap
+        
+    Returns:
+        tuple: (Pagination, sort key, order)
+    """
+    sort = request.args.get('sort')
+    if sort not in sorts:
+        sort = default_sort
+    order = 'asc' if request.args.get('order') == 'asc' else 'desc'
+    column = sorts[sort]
+    query = query.order_by(column.asc() if order == 'asc' else column.desc(), primary_key)
+    pagination = query.paginate(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', app.config['ADMIN_TABLE_PAGE_SIZE'], type=int),
+        max_per_page=app.config['MAX_ADMIN_TABLE_PAGE_SIZE'],
+        error_out=False
+    )
+    return pagination, sort, order
+
+def admin_table_response(pagination, sort, order, html):
+    """Build the JSON payload shared by the admin table endpoints"""
+    return jsonify({
+        'page': pagination.page,
+        'pages': pagination.pages,
+        'total': pagination.total,
+        'sort': sort,
+        'order': order,
+        'html': html
+    })
+
+@app.template_global()
+def url_for_page(page, page_arg='page'):
+    """URL of the current page with one pagination argument replaced"""
+    args = request.args.to_dict()
+    args[page_arg] = page
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+@app.template_global()
+def url_for_filters(**changes):
+    """URL of the current page with filter arguments replaced (None removes one)"""
+    args = request.args.to_dict()
+    for name, value in changes.items():
+        if value is None:
+            args.pop(name, None)
+        else:
+            args[name] = value
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
     if current_user.role == 'admin':
-        pending_services = ServiceModel.query.filter_by(is_approved=False, is_rejected=False, is_held=False).all()
-        rejected_services = ServiceModel.query.filter_by(is_rejected=True).all()
-        held_services = ServiceModel.query.filter_by(is_held=True).all()
-        all_services = ServiceModel.query.all()
-        service_providers = User.query.filter_by(role='provider').all()
-        return render_template('admin.html', pending_services=pending_services, rejected_services=rejected_services, held_services=held_services, all_services=all_services, service_providers=service_providers)
+        # Tables are fetched page by page from the admin API as each section scrolls into view
+        return render_template('admin.html', status_counts=service_status_counts())
     elif current_user.role == 'provider':
-        my_services = ServiceModel.query.filter_by(provider_id=current_user.id).all()
-        return render_template('provider_dashboard.html', services=my_services)
+        status_counts = service_status_counts(ServiceModel.provider_id == current_user.id)
+        my_services = ServiceModel.query.filter_by(provider_id=current_user.id)
+        per_page = app.config['PROVIDER_TABLE_PAGE_SIZE']
+        
+        def paginate(query, page_arg):
+            return query.order_by(ServiceModel.created_at.desc(), ServiceModel.id).paginate(
+                page=request.args.get(page_arg, 1, type=int), per_page=per_page, error_out=False
+            )
+        
+        services = paginate(my_services, 'page')
+        # The action-required sections are only queried when the summary says they have rows
+        rejected_services = paginate(my_services.filter_by(is_rejected=True), 'rejected_page') if status_counts['rejected'] else None
+        held_services = paginate(my_services.filter_by(is_held=True), 'held_page') if status_counts['held'] else None
+        
+        # Unread notifications about each listed service, in one grouped query
+        unread_by_service = dict(db.session.execute(
+            select(Notification.service_id, func.count())
+            .where(
+                Notification.user_id == current_user.id,
+                Notification.service_id.in_([service.id for service in services.items]),
+                Notification.is_read == False
+            )
+            .group_by(Notification.service_id)
+        ).all())
+        return render_template('provider_dashboard.html', status_counts=status_counts, services=services,
+                               rejected_services=rejected_services, held_services=held_services,
+                               unread_by_service=unread_by_service)
     else:
         return render_template('dashboard.html')
 
+@app.route('/api/admin/services')
+@login_required
+def api_admin_services():
+    """Return one sorted page of an admin dashboard service table"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    status = request.args.get('status', 'all')
+    if status not in ADMIN_SERVICE_FILTERS:
+        return jsonify({'error': 'Unknown status'}), 400
+    
+    query = ServiceModel.query.options(joinedload(ServiceModel.provider)).filter(*ADMIN_SERVICE_FILTERS[status])
+    pagination, sort, order = paginate_admin_table(query, ADMIN_SERVICE_SORTS, 'created_at', ServiceModel.id)
+    html = render_template('_admin_service_rows.html', services=pagination.items, status=status)
+    return admin_table_response(pagination, sort, order, html)
+
+@app.route('/api/admin/providers')
+@login_required
+def api_admin_providers():
+    """Return one sorted page of the admin dashboard provider table"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    query = User.query.filter_by(role='provider')
+    pagination, sort, order = paginate_admin_table(query, ADMIN_PROVIDER_SORTS, 'created_at', User.id)
+    html = render_template('_admin_provider_rows.html', providers=pagination.items)
+    return admin_table_response(pagination, sort, order, html)
+
+def find_duplicate_services(rows, tolerance):
+    """
+    Find import rows matching an existing service
+
+    A duplicate has the same name (case-insensitively) and lies within
+    tolerance degrees of the row's coordinates. The whole batch is checked
+    in one query, probing the location index once per row.
+
+    Returns:
+        set: Positions in rows of the duplicates
+    """
+    candidates = json.dumps([[row['name'], row['latitude'], row['longitude']] for row in rows])
+    return {position for position, in db.session.execute(text(
+        """SELECT DISTINCT CAST(candidate.key AS INTEGER) FROM json_each(:candidates) AS candidate
+           JOIN service_model
+             ON service_model.latitude BETWEEN json_extract(candidate.value, '$[1]') - :tolerance
+                                           AND json_extract(candidate.value, '$[1]') + :tolerance
+            AND service_model.longitude BETWEEN json_extract(candidate.value, '$[2]') - :tolerance
+                                            AND json_extract(candidate.value, '$[2]') + :tolerance
+            AND lower(service_model.name) = lower(json_extract(candidate.value, '$[0]'))"""
+    ), {'candidates': candidates, 'tolerance': tolerance})}
+
+def import_services(records, report, provider_id=None, approve=False, notify_url=None, on_batch=None):
+    """
+    Validate and insert services from an import stream in bulk batches
+
+    Records are consumed lazily, so memory stays bounded by one batch. Each
+    batch is deduplicated against the database and itself, inserted with
+    one multi-row statement, and committed together with a single admin
+    notification.
+
+    Args:
+        records: Iterable of (line number, record) pairs (see read_records)
+        report (ImportReport): Totals and rejects, updated as batches commit
+        provider_id (int): Provider owning the imported services (optional)
+        approve (bool): Publish the services immediately instead of queueing them for approval
+        notify_url (str): Link in the admin notifications
+        on_batch: Callable receiving the report after each committed batch
+    """
+    tolerance = app.config['IMPORT_DUPLICATE_TOLERANCE']
+    for chunk in chunked(records, app.config['IMPORT_BATCH_SIZE']):
+        rows = []
+        seen = set()
+        for line, record in chunk:
+            report.read += 1
+            try:
+                service = validate_service(record)
+            except ImportRowError as error:
+                report.reject(line, str(error))
+                continue
+            key = (service['name'].lower(), round(service['latitude'] / tolerance), round(service['longitude'] / tolerance))
+            if key in seen:
+                report.duplicates += 1
+                continue
+            seen.add(key)
+            rows.append(dict(service, provider_id=provider_id, is_approved=approve))
+
+        duplicates = find_duplicate_services(rows, tolerance) if rows else set()
+        report.duplicates += len(duplicates)
+        rows = [row for position, row in enumerate(rows) if position not in duplicates]
+        if not rows:
+            continue
+
+        service_ids = db.session.execute(
+            insert(ServiceModel).returning(ServiceModel.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        intervals = []
+        for service_id, row in zip(service_ids, rows):
+            try:
+                intervals.extend(
+                    {'service_id': service_id, 'opens': opens, 'closes': closes}
+                    for opens, closes in parse_hours(row['hours'])
+                )
+            except HoursFormatError:
+                pass
+        if intervals:
+            db.session.execute(insert(ServiceHours), intervals)
+        create_notifications(
+            message=f"{len(rows)} service(s) imported" + ('.' if approve else ' and awaiting approval.'),
+            url=notify_url,
+            role='admin'
+        )
+        db.session.commit()
+        report.inserted += len(rows)
+        report.batches += 1
+        if on_batch is not None:
+            on_batch(report)
+    report.finish()
+
+    # Inside the web process the read models catch up at once; running web processes pick up
+    # a CLI import from the service_change log within READ_MODEL_SYNC_INTERVAL
+    if report.inserted:
+        response_cache.bump_version()
+        sync_service_indexes(force=True)
+
+def import_format(filename, requested=None):
+    """Pick the import format from an explicit choice or the file extension ('.ndjson' counts as JSONL)"""
+    fmt = (requested or os.path.splitext(filename or '')[1].lstrip('.')).lower()
+    return 'jsonl' if fmt == 'ndjson' else fmt
+
+@app.route('/api/admin/services/import', methods=['POST'])
+@login_required
+def api_admin_import_services():
+    """Import services from an uploaded CSV or JSON Lines file and return the import report"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'error': 'No file uploaded'}), 400
+    fmt = import_format(upload.filename, request.form.get('format'))
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format; use one of {', '.join(IMPORT_FORMATS)}"}), 400
+
+    # Uploads are spooled to disk by Werkzeug, so the file is read incrementally
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    report = ImportReport(max_rejects=app.config['IMPORT_MAX_REPORTED_REJECTS'])
+    import_services(
+        read_records(stream, fmt), report,
+        approve=request.form.get('approve') in ('1', 'true', 'on'),
+        notify_url=url_for('dashboard')
+    )
+    return jsonify(report.to_dict())
+
+# Columns of each export dataset, in output order
+EXPORT_COLUMNS = {
+    'services': {
+        'id': ServiceModel.id,
+        'name': ServiceModel.name,
+        'category': ServiceModel.category,
+        'description': ServiceModel.description,
+        'address': ServiceModel.address,
+        'latitude': ServiceModel.latitude,
+        'longitude': ServiceModel.longitude,
+        'phone': ServiceModel.phone,
+        'email': ServiceModel.email,
+        'hours': ServiceModel.hours,
+        'rating': ServiceModel.rating,
+        'review_count': ServiceModel.review_count,
+        'is_approved': ServiceModel.is_approved,
+        'is_held': ServiceModel.is_held,
+        'created_at': ServiceModel.created_at
+    },
+    'reviews': {
+        'id': Review.id,
+        'service_id': Review.service_id,
+        'rating': Review.rating,
+        'comment': Review.comment,
+        'provider_response': Review.provider_response,
+        'response_date': Review.response_date,
+        'created_at': Review.created_at
+    }
+}
+
+def export_statement(dataset, include_unlisted=False):
+    """
+    Build the query of an export dataset
+
+    Args:
+        dataset (str): 'services' or 'reviews'
+        include_unlisted (bool): Also export pending, rejected and held services
+            (and their reviews) instead of only publicly visible ones
+
+    Returns:
+        Select: Statement ordered by ID
+    """
+    model = ServiceModel if dataset == 'services' else Review
+    statement = select(*EXPORT_COLUMNS[dataset].values()).order_by(model.id)
+    if dataset == 'reviews':
+        statement = statement.join(ServiceModel, Review.service_id == ServiceModel.id)
+    if not include_unlisted:
+        statement = statement.where(ServiceModel.is_approved == True, ServiceModel.is_held == False)
+    return statement
+
+def export_data(dataset, fmt, include_unlisted=False, compress=False):
+    """
+    Stream an export dataset as encoded chunks
+
+    Rows are read through a server-side cursor EXPORT_CHUNK_SIZE at a time
+    and each chunk is written and encoded before the next is fetched, so
+    memory use does not grow with the size of the catalogue.
+
+    Args:
+        dataset (str): 'services' or 'reviews'
+        fmt (str): One of EXPORT_FORMATS ('geojson' only for services)
+        include_unlisted (bool): See export_statement
+        compress (bool): Gzip the output
+
+    Yields:
+        bytes: Chunks of the export file
+    """
+    statement = export_statement(dataset, include_unlisted).execution_options(
+        yield_per=app.config['EXPORT_CHUNK_SIZE']
+    )
+    chunks = db.session.execute(statement).partitions()
+    text_chunks = EXPORT_WRITERS[fmt](list(EXPORT_COLUMNS[dataset]), chunks)
+    yield from encode_chunks(text_chunks, compress=compress, level=app.config['EXPORT_GZIP_LEVEL'])
+
+def export_error(dataset, fmt):
+    """Describe what is wrong with an export request, or None if it is valid"""
+    if dataset not in EXPORT_COLUMNS:
+        return f"Unknown dataset; use one of {', '.join(EXPORT_COLUMNS)}"
+    if fmt not in EXPORT_FORMATS:
+        return f"Unsupported format; use one of {', '.join(EXPORT_FORMATS)}"
+    if fmt == 'geojson' and dataset != 'services':
+        return 'GeoJSON is only available for services'
+    return None
+
+@app.route('/api/admin/export/<dataset>')
+@login_required
+def api_admin_export(dataset):
+    """
+    Download a full export of services or reviews
+
+    Query arguments:
+        format: 'csv' (default), 'jsonl' or 'geojson'
+        gzip: 1 to download a gzip-compressed file
+        all: 1 to include services that are not publicly visible
+    """
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    fmt = request.args.get('format', 'csv')
+    error = export_error(dataset, fmt)
+    if error:
+        return jsonify({'error': error}), 400
+    compress = request.args.get('gzip') in ('1', 'true')
+
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d}.{fmt}" + ('.gz' if compress else '')
+    response = app.response_class(
+        stream_with_context(export_data(dataset, fmt, request.args.get('all') in ('1', 'true'), compress)),
+        mimetype='application/gzip' if compress else EXPORT_MEDIA_TYPES[fmt]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.cache_control.no_store = True
+    return response
+
+def services_within_distance(lat, lon, radius_km, include_unapproved):
+    """
+    Measure the distance to every non-held service within a radius of a point
+
+    Candidates come from the R*Tree bounding-box lookup together with their
+    coordinates, so only nearby services are measured and every process
+    sees the committed state of the database.
+
+    Args:
+        include_unapproved (bool): Also measure unapproved services (staff searches)
+
+    Returns:
+        dict: Service ID -> distance in km
+    """
+    query = db.session.query(ServiceModel.id, ServiceModel.latitude, ServiceModel.longitude).filter(
+        ServiceModel.is_held == False
+    )
+    if not include_unapproved:
+        query = query.filter(ServiceModel.is_approved == True)
+    distances = {}
+    for service_id, latitude, longitude in filter_within_radius(query, lat, lon, radius_km):
+        distance = haversine_distance(lat, lon, latitude, longitude)
+        if distance <= radius_km:
+            distances[service_id] = distance
+    return distances
+
+def search_facets(query, min_rating=None, category=None, distances=None, radius=None):
+    """
+    Count search results per category, rating bucket and distance band
+
+    One grouped query counts the results in every (category, rating,
+    distance band) cell; each facet is then summed from those cells with
+    the other facets' filters applied but not its own, so a count is the
+    number of results that choosing the option would give.
+
+    Args:
+        query: ServiceModel query with every filter except the facet ones
+        min_rating (float): Active minimum rating filter
+        category (str): Active category filter
+        distances (dict): Service ID -> km for services near the user, or None
+            without a location
+        radius (float): Active radius filter in km
+
+    Returns:
+        Dict: 'categories' [(name, count)] most common first, 'ratings'
+              [(stars, count)] for 4+ down to 1+, and 'distances'
+              [(km, count)] per band (empty without a location)
+    """
+    rating = func.coalesce(ServiceModel.rating, 0)
+    columns = [
+        ServiceModel.category,
+        func.cast(rating, Integer).label('stars'),
+        (rating >= min_rating if min_rating is not None else literal(True)).label('rating_ok')
+    ]
+    bands = app.config['SEARCH_DISTANCE_BANDS']
+    query = query.order_by(None)
+    if distances is not None:
+        measured = text(
+            "SELECT CAST(key AS INTEGER) AS id, value AS km FROM json_each(:distances)"
+        ).bindparams(distances=json.dumps(distances)).columns(id=Integer, km=Float).subquery('distances')
+        query = query.outerjoin(measured, measured.c.id == ServiceModel.id)
+        columns.append(case(*[(measured.c.km <= band, index) for index, band in enumerate(bands)]).label('band'))
+        columns.append((measured.c.km <= radius if radius is not None else literal(True)).label('radius_ok'))
+    else:
+        columns += [literal(None).label('band'), literal(True).label('radius_ok')]
+    cells = query.with_entities(*columns, func.count()).group_by(*columns[:5]).all()
+
+    categories, ratings, in_band = {}, [0] * 5, [0] * len(bands)
+    for cell_category, stars, rating_ok, band, radius_ok, count in cells:
+        category_ok = not category or cell_category == category
+        if rating_ok and radius_ok:
+            categories[cell_category] = categories.get(cell_category, 0) + count
+        if category_ok and radius_ok:
+            for bucket in range(1, min(stars, 4) + 1):
+                ratings[bucket] += count
+        if category_ok and rating_ok and band is not None:
+            in_band[band] += count
+    return {
+        'categories': sorted(categories.items(), key=lambda item: (-item[1], item[0])),
+        'ratings': [(stars, ratings[stars]) for stars in range(4, 0, -1)],
+        'distances': [] if distances is None else [
+            (band, sum(in_band[:index + 1])) for index, band in enumerate(bands)
+        ]
+    }
+
+def parse_open_at(value):
+    """Parse an open_at argument (ISO date and time, e.g. '2024-05-06T14:30') into a minute of the week"""
+    try:
+        return minute_of_week(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+def search_open_minute():
+    """Minute of the week a search's open-now/open-at filter refers to, or None"""
+    open_at = request.args.get('open_at')
+    if open_at:
+        return parse_open_at(open_at)
+    if request.args.get('open_now'):
+        return current_hours_minute()
+    return None
+
 @app.route('/search')
+@cached_response(personalized=True, extra_key=search_open_minute)
 def search():
     query = request.args.get('q', '')
     category = request.args.get('category', '')
@@ -184,23 +1582,30 @@ def search():
     user_lon = request.args.get('user_lon', type=float)
     radius = request.args.get('radius', type=float)
     min_rating = request.args.get('min_rating', type=float)
+    open_now = bool(request.args.get('open_now'))
+    open_at = request.args.get('open_at', '')
+    open_minute = search_open_minute()
     
     # Determine the base query for services based on user role
-    if current_user.is_authenticated and current_user.role in ['admin', 'provider']:
+    is_staff = current_user.is_authenticated and current_user.role in ['admin', 'provider']
+    if is_staff:
         # Admins and providers can see all services (approved or not, but not held)
         base_services_query = ServiceModel.query.filter_by(is_held=False)
     else:
         # General users (and unauthenticated users) can only see approved services that are not held
         base_services_query = ServiceModel.query.filter_by(is_approved=True, is_held=False)
 
-    # Apply keyword/category search first to the query object
+    # Apply keyword/category search first to the query object (ranked by relevance)
     if query:
-        base_services_query = base_services_query.filter(
-            (ServiceModel.name.ilike(f'%{query}%')) |
-            (ServiceModel.description.ilike(f'%{query}%')) |
-            (ServiceModel.address.ilike(f'%{query}%'))
-        )
+        base_services_query = filter_by_keywords(base_services_query, query)
     
+    # Apply the opening hours filter (open_at takes precedence over open_now)
+    if open_minute is not None:
+        base_services_query = filter_open_at(base_services_query, open_minute)
+
+    # Facet counts start from here: each facet leaves out its own filter
+    facet_query = base_services_query
+
     if category:
         base_services_query = base_services_query.filter_by(category=category)
 
@@ -208,18 +1613,22 @@ def search():
     if min_rating is not None:
         base_services_query = base_services_query.filter(ServiceModel.rating >= min_rating)
 
-    # Execute the query to get services before applying proximity filter in Python
-    services = base_services_query.all()
+    has_location = user_lat is not None and user_lon is not None
+    has_proximity_filter = has_location and radius is not None
 
-    # Apply proximity filter if coordinates and radius are provided
-    if user_lat is not None and user_lon is not None and radius is not None:
-        filtered_services = []
-        for service in services:
-            if service.latitude is not None and service.longitude is not None:
-                distance = haversine_distance(user_lat, user_lon, service.latitude, service.longitude)
-                if distance <= radius:
-                    filtered_services.append(service)
-        services = filtered_services
+    # Measure once for both the radius filter and the distance facet
+    distances = None
+    if has_location:
+        distances = services_within_distance(
+            user_lat, user_lon, max(radius or 0, app.config['SEARCH_DISTANCE_BANDS'][-1]), is_staff
+        )
+
+    if has_proximity_filter:
+        base_services_query = filter_by_ids(
+            base_services_query, [service_id for service_id, distance in distances.items() if distance <= radius]
+        )
+    services = base_services_query.all()
+    facets = search_facets(facet_query, min_rating, category, distances, radius if has_proximity_filter else None)
 
     # Use Strategy Pattern for search (this part might need re-evaluation if the search logic is now handled above)
     # For now, keeping it as is, but it might be redundant if filtering is done directly
@@ -230,9 +1639,13 @@ def search():
     # search_service = SearchService(search_strategy)
     # services = search_service.execute_search(query, base_services_query.all())
     
+    # Unfiltered public results are the whole (category) catalogue: the map then draws
+    # server-side clusters for its viewport instead of one marker per embedded service
+    cluster_map = not is_staff and not query and min_rating is None and not has_proximity_filter and open_minute is None
+    
     # Convert services to dictionaries for JSON serialization
     services_dict = []
-    for service in services:
+    for service in ([] if cluster_map else services):
         services_dict.append({
             'id': service.id,
             'name': service.name,
@@ -245,7 +1658,7 @@ def search():
             'is_approved': service.is_approved
         })
     
-    return render_template('search.html', services=services, services_json=services_dict, query=query, category=category, user_lat=user_lat, user_lon=user_lon, radius=radius, min_rating=min_rating)
+    return render_template('search.html', services=services, services_json=services_dict, cluster_map=cluster_map, query=query, category=category, user_lat=user_lat, user_lon=user_lon, radius=radius, min_rating=min_rating, open_now=open_now, open_at=open_at, open_filter=open_minute is not None, facets=facets)
 
 @app.route('/service/<int:service_id>')
 def service_detail(service_id):
@@ -263,8 +1676,42 @@ def service_detail(service_id):
             flash('This service is not yet approved.')
             return redirect(url_for('search'))
 
-    reviews = Review.query.filter_by(service_id=service_id).all()
-    return render_template('service_detail.html', service=service, reviews=reviews)
+    reviews, next_review_cursor = load_review_page(service_id)
+    return render_template('service_detail.html', service=service, reviews=reviews, next_review_cursor=next_review_cursor)
+
+@app.route('/api/services/<int:service_id>/reviews')
+def api_service_reviews(service_id):
+    """Return the next page of a service's reviews for infinite scrolling"""
+    service = ServiceModel.query.get_or_404(service_id)
+    if not can_view_service(service):
+        return jsonify({'error': 'Service not found'}), 404
+    
+    cursor = request.args.get('cursor')
+    try:
+        cursor = decode_review_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    limit = min(request.args.get('limit', app.config['REVIEWS_PER_PAGE'], type=int), app.config['MAX_REVIEWS_PER_PAGE'])
+    
+    reviews, next_cursor = load_review_page(service_id, cursor, max(limit, 1))
+    return jsonify({
+        'reviews': [{
+            'id': review.id,
+            'rating': review.rating,
+            'comment': review.comment,
+            'username': review.user.username if review.user else None,
+            'created_at': review.created_at.isoformat(),
+            'provider_response': review.provider_response,
+            'response_date': review.response_date.isoformat() if review.response_date else None
+        } for review in reviews],
+        'next_cursor': next_cursor,
+        'html': render_template('_reviews.html', reviews=reviews, service=service)
+    })
+
+HOURS_NOT_RECOGNIZED_MESSAGE = (
+    'The operating hours could not be understood, so this service will not appear in "Open now" searches. '
+    'Use a format like "Mon-Fri 9AM-5PM, Sat 10AM-2PM" or "24/7".'
+)
 
 @app.route('/add_service', methods=['GET', 'POST'])
 @login_required
@@ -297,18 +1744,23 @@ def add_service():
         )
         
         db.session.add(service)
-        db.session.commit()
+        db.session.flush()
+        hours_recognized = sync_service_hours(service)
+
+        # Notify all admins in the same transaction
+        create_notifications(
+            message=f'New service listing submitted: {service.name} by {current_user.username}.',
+            url=url_for('service_detail', service_id=service.id),
+            role='admin',
+            service_id=service.id
+        )
 
-        # Notify all admins
-        admins = User.query.filter_by(role='admin').all()
-        for admin in admins:
-            create_notification(
-                user_id=admin.id,
-                message=f'New service listing submitted: {service.name} by {current_user.username}.',
-                url=url_for('service_detail', service_id=service.id)
-            )
+        db.session.commit()
+        refresh_service_indexes(service)
 
         flash('Service added successfully! Pending admin approval.')
+        if not hours_recognized:
+            flash(HOURS_NOT_RECOGNIZED_MESSAGE)
         return redirect(url_for('dashboard'))
     
     return render_template('add_service.html')
@@ -345,6 +1797,7 @@ def update_service(service_id):
         service.phone = request.form['phone']
         service.email = request.form['email']
         service.hours = request.form['hours']
+        hours_recognized = sync_service_hours(service)
         service.latitude = latitude
         service.longitude = longitude
         
@@ -356,18 +1809,20 @@ def update_service(service_id):
         # Reset approval status since content changed
         service.is_approved = False
         
+        # Notify all admins in the same transaction
+        create_notifications(
+            message=f'Service listing updated: {service.name} by {current_user.username}.',
+            url=url_for('service_detail', service_id=service.id),
+            role='admin',
+            service_id=service.id
+        )
+        
         db.session.commit()
-
-        # Notify all admins
-        admins = User.query.filter_by(role='admin').all()
-        for admin in admins:
-            create_notification(
-                user_id=admin.id,
-                message=f'Service listing updated: {service.name} by {current_user.username}.',
-                url=url_for('service_detail', service_id=service.id)
-            )
+        refresh_service_indexes(service)
 
         flash('Service updated successfully! Pending admin approval.')
+        if not hours_recognized:
+            flash(HOURS_NOT_RECOGNIZED_MESSAGE)
         return redirect(url_for('service_detail', service_id=service.id))
     
     return render_template('update_service.html', service=service)
@@ -399,24 +1854,47 @@ def add_review(service_id):
     
     db.session.add(review)
     
-    # Update service rating
-    service_reviews = Review.query.filter_by(service_id=service_id).all()
-    if service_reviews:
-        service.rating = sum(r.rating for r in service_reviews) / len(service_reviews)
-    
-    db.session.commit()
+    # Update service rating aggregates in the same transaction
+    add_review_to_aggregates(service_id, rating)
+    db.session.flush()
 
-    # Notify provider - now we can use the review.id since it's been committed
+    # Notify provider - review.id is available after the flush
     if service.provider_id:
         create_notification(
             user_id=service.provider_id,
             message=f'You received a new review for {service.name}.',
-            url=url_for('service_detail', service_id=service.id, _anchor=f'review-{review.id}')
+            url=url_for('service_detail', service_id=service.id, _anchor=f'review-{review.id}'),
+            service_id=service.id
         )
+    
+    db.session.commit()
+    refresh_service_indexes(service)
 
     flash('Review added successfully!')
     return redirect(url_for('service_detail', service_id=service_id))
 
+@app.route('/delete_review/<int:review_id>', methods=['POST'])
+@login_required
+def delete_review(review_id):
+    if current_user.role != 'admin':
+        flash('Only administrators can moderate reviews')
+        return redirect(url_for('dashboard'))
+    
+    review = Review.query.get_or_404(review_id)
+    service_id = review.service_id
+    
+    # Remove the review from the service rating aggregates, then delete it
+    subtract_reviews_from_aggregates(Review.id == review.id)
+    db.session.delete(review)
+    db.session.commit()
+    
+    service = db.session.get(ServiceModel, service_id)
+    if service:
+        refresh_service_indexes(service)
+    
+    flash('Review has been removed.')
+    return redirect(url_for('service_detail', service_id=service_id))
+
 @app.route('/respond_to_review/<int:review_id>', methods=['POST'])
 @login_required
 def respond_to_review(review_id):
@@ -437,16 +1915,17 @@ def respond_to_review(review_id):
     # Update the review with provider response
     review.provider_response = response_text
     review.response_date = datetime.utcnow()
-    
-    db.session.commit()
 
     # Notify review author
     if review.user_id:
         create_notification(
             user_id=review.user_id,
             message=f'Your review for {service.name} received a reply from the provider.',
-            url=url_for('service_detail', service_id=service.id, _anchor=f'review-{review.id}')
+            url=url_for('service_detail', service_id=service.id, _anchor=f'review-{review.id}'),
+            service_id=service.id
         )
+    
+    db.session.commit()
 
     flash('Response added successfully!')
     return redirect(url_for('service_detail', service_id=service.id))
@@ -499,16 +1978,19 @@ def approve_service(service_id):
     service.is_rejected = False
     service.rejection_reason = None
     service.rejected_at = None
-    db.session.commit()
 
     # Notify provider
     if service.provider_id:
         create_notification(
             user_id=service.provider_id,
             message=f'Your service "{service.name}" has been approved and is now live.',
-            url=url_for('service_detail', service_id=service.id, _anchor='service-details')
+            url=url_for('service_detail', service_id=service.id, _anchor='service-details'),
+            service_id=service.id
         )
 
+    db.session.commit()
+    refresh_service_indexes(service)
+
     flash(f'Service "{service.name}" has been approved and is now live!')
     return redirect(url_for('service_detail', service_id=service_id))
 
@@ -530,21 +2012,50 @@ def reject_service(service_id):
         service.rejection_reason = rejection_reason
         service.rejected_at = datetime.utcnow()
         
-        db.session.commit()
-        
         # Notify provider
         if service.provider_id:
             create_notification(
                 user_id=service.provider_id,
                 message=f'Your service "{service.name}" was rejected. Reason: {service.rejection_reason}',
-                url=url_for('service_detail', service_id=service.id, _anchor='rejection-notice')
+                url=url_for('service_detail', service_id=service.id, _anchor='rejection-notice'),
+                service_id=service.id
             )
 
+        db.session.commit()
+        refresh_service_indexes(service)
+
         flash(f'Service "{service.name}" has been rejected.')
         return redirect(url_for('service_detail', service_id=service_id))
     
     return render_template('reject_service.html', service=service)
 
+def delete_services(*criteria):
+    """
+    Delete the services matching criteria together with everything that depends on them
+
+    Their reviews, opening hours, notifications and queued notification
+    events go too. Each table is cleared with one set-based DELETE keyed on
+    a subquery, so no ORM objects are loaded however many services match;
+    the full-text and spatial indexes follow through their triggers. Runs
+    in the current transaction.
+
+    Returns:
+        tuple: (deleted service IDs, IDs of users who lost notifications)
+    """
+    service_ids = db.session.scalars(select(ServiceModel.id).where(*criteria)).all()
+    if not service_ids:
+        return [], []
+    matching = select(ServiceModel.id).where(*criteria).scalar_subquery()
+    notified_user_ids = db.session.scalars(
+        select(Notification.user_id).where(Notification.service_id.in_(matching)).distinct()
+    ).all()
+    for column in (Review.service_id, ServiceHours.service_id, Notification.service_id, NotificationOutbox.service_id):
+        db.session.execute(
+            delete(column.class_).where(column.in_(matching)).execution_options(synchronize_session=False)
+        )
+    db.session.execute(delete(ServiceModel).where(*criteria).execution_options(synchronize_session=False))
+    return service_ids, notified_user_ids
+
 @app.route('/delete_service/<int:service_id>', methods=['POST'])
 @login_required
 def delete_service(service_id):
@@ -552,16 +2063,15 @@ def delete_service(service_id):
         flash('Only administrators can delete services.')
         return redirect(url_for('dashboard'))
     
-    service = ServiceModel.query.get_or_404(service_id)
-    
-    # Delete associated reviews first
-    Review.query.filter_by(service_id=service_id).delete()
+    service_name = ServiceModel.query.get_or_404(service_id).name
     
-    # Delete the service
-    db.session.delete(service)
+    # Delete the service with its reviews, opening hours and notifications
+    _, notified_user_ids = delete_services(ServiceModel.id == service_id)
     db.session.commit()
+    invalidate_unread_notification_counts(notified_user_ids)
+    remove_from_service_indexes([service_id])
     
-    flash(f'Service "{service.name}" has been deleted successfully.')
+    flash(f'Service "{service_name}" has been deleted successfully.')
     return redirect(url_for('dashboard'))
 
 @app.route('/delete_user/<int:user_id>', methods=['POST'])
@@ -576,25 +2086,29 @@ def delete_user(user_id):
     if user.id == current_user.id:
         flash('You cannot delete your own account')
         return redirect(url_for('dashboard'))
+    username = user.username
     
-    # Delete all services associated with this user
-    services = ServiceModel.query.filter_by(provider_id=user.id).all()
-    for service in services:
-        db.session.delete(service)
+    # Delete all services associated with this user, with their reviews and notifications
+    service_ids, notified_user_ids = delete_services(ServiceModel.provider_id == user.id)
     
-    # Delete all reviews by this user
-    reviews = Review.query.filter_by(user_id=user.id).all()
-    for review in reviews:
-        db.session.delete(review)
+    # Delete all reviews by this user, taking them out of the rated services' aggregates
+    rated_service_ids = subtract_reviews_from_aggregates(Review.user_id == user.id)
+    db.session.execute(delete(Review).where(Review.user_id == user.id).execution_options(synchronize_session=False))
     
-    # Delete all notifications for this user
-    Notification.query.filter_by(user_id=user.id).delete()
+    # Delete this user's notifications and queued events, and clear holds they placed
+    db.session.execute(delete(Notification).where(Notification.user_id == user.id).execution_options(synchronize_session=False))
+    db.session.execute(delete(NotificationOutbox).where(NotificationOutbox.user_id == user.id).execution_options(synchronize_session=False))
+    db.session.execute(update(ServiceModel).where(ServiceModel.held_by == user.id).values(held_by=None).execution_options(synchronize_session=False))
     
     # Delete the user
-    db.session.delete(user)
+    db.session.execute(delete(User).where(User.id == user.id).execution_options(synchronize_session=False))
     db.session.commit()
+    invalidate_unread_notification_counts([user_id, *notified_user_ids])
+    remove_from_service_indexes(service_ids)
+    for service in filter_by_ids(ServiceModel.query, rated_service_ids):
+        refresh_service_indexes(service)
     
-    flash(f'User "{user.username}" and all associated data have been deleted')
+    flash(f'User "{username}" and all associated data have been deleted')
     return redirect(url_for('dashboard'))
 
 @app.route('/hold_service/<int:service_id>', methods=['GET', 'POST'])
@@ -625,16 +2139,18 @@ def hold_service(service_id):
         service.held_by = current_user.id
         service.held_at = datetime.utcnow()
         
-        db.session.commit()
-
         # Notify provider
         if service.provider_id:
             create_notification(
                 user_id=service.provider_id,
                 message=f'Your service "{service.name}" has been placed on hold. Reason: {service.hold_reason}',
-                url=url_for('service_detail', service_id=service.id, _anchor='hold-notice')
+                url=url_for('service_detail', service_id=service.id, _anchor='hold-notice'),
+                service_id=service.id
             )
 
+        db.session.commit()
+        refresh_service_indexes(service)
+
         flash(f'Service "{service.name}" has been placed on hold. Reason: {full_reason}')
         return redirect(url_for('service_detail', service_id=service_id))
     
@@ -659,33 +2175,204 @@ def unhold_service(service_id):
     service.held_by = None
     service.held_at = None
     
-    db.session.commit()
-
     # Notify provider
     if service.provider_id:
         create_notification(
             user_id=service.provider_id,
             message=f'Your service "{service.name}" is no longer on hold and is available to users.',
-            url=url_for('service_detail', service_id=service.id, _anchor='service-details')
+            url=url_for('service_detail', service_id=service.id, _anchor='service-details'),
+            service_id=service.id
         )
 
+    db.session.commit()
+    refresh_service_indexes(service)
+
     flash(f'Service "{service.name}" has been removed from hold and is now available.')
     return redirect(url_for('service_detail', service_id=service_id))
 
+# Fields selectable with /api/services?fields=..., including short aliases for map clients
+API_SERVICE_FIELDS = {
+    'id': ServiceModel.id,
+    'name': ServiceModel.name,
+    'category': ServiceModel.category,
+    'address': ServiceModel.address,
+    'latitude': ServiceModel.latitude,
+    'longitude': ServiceModel.longitude,
+    'lat': ServiceModel.latitude,
+    'lng': ServiceModel.longitude,
+    'rating': ServiceModel.rating
+}
+API_SERVICE_DEFAULT_FIELDS = ['id', 'name', 'category', 'address', 'latitude', 'longitude', 'rating']
+
+def parse_service_fields(default):
+    """
+    Read the fields= argument of the service APIs
+    
+    Returns:
+        tuple: (field names, unknown field names)
+    """
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    fields = fields or default
+    return fields, [field for field in fields if field not in API_SERVICE_FIELDS]
+
 @app.route('/api/services')
+@cached_response(conditional=True)
 def api_services():
-    services = ServiceModel.query.filter_by(is_approved=True).all()
-    return jsonify([{
-        'id': s.id,
-        'name': s.name,
-        'category': s.category,
-        'address': s.address,
-        'latitude': s.latitude,
-        'longitude': s.longitude,
-        'rating': s.rating
-    } for s in services])
+    """
+    List publicly visible services in ID order
+    
+    Query arguments:
+        fields: Comma-separated fields to return (default: all)
+        after: Only return services with a greater ID (keyset cursor)
+        limit: Maximum number of services; with after or limit the response
+            is an object holding 'services' and the 'next_after' cursor
+        format: 'ndjson' streams one JSON object per line from a server-side
+            cursor instead of building the whole response in memory
+    """
+    fields, unknown = parse_service_fields(API_SERVICE_DEFAULT_FIELDS)
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, app.config['API_SERVICES_MAX_LIMIT']))
+    
+    # The ID is always selected (last) so a page can report its cursor
+    statement = select(*(API_SERVICE_FIELDS[field] for field in fields), ServiceModel.id).where(
+        ServiceModel.is_approved == True, ServiceModel.is_held == False
+    ).order_by(ServiceModel.id)
+    if after is not None:
+        statement = statement.where(ServiceModel.id > after)
+    if limit is not None:
+        statement = statement.limit(limit)
+    
+    def as_dict(row):
+        return dict(zip(fields, row))
+    
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            for row in db.session.execute(statement.execution_options(yield_per=500)):
+                yield json.dumps(as_dict(row)) + '\n'
+        return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    rows = db.session.execute(statement).all()
+    if after is None and limit is None:
+        return jsonify([as_dict(row) for row in rows])
+    return jsonify({
+        'services': [as_dict(row) for row in rows],
+        'next_after': rows[-1][-1] if limit is not None and len(rows) == limit else None
+    })
+
+def parse_bbox(value):
+    """
+    Parse a 'min_lng,min_lat,max_lng,max_lat' viewport (Leaflet's toBBoxString order)
+    
+    Longitudes are wrapped into [-180, 180], so min_lng > max_lng afterwards
+    means the viewport crosses the antimeridian.
+    
+    Returns:
+        tuple: (min_lng, min_lat, max_lng, max_lat), or None if malformed
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in (value or '').split(','))
+    except ValueError:
+        return None
+    if not all(math.isfinite(part) for part in (min_lng, min_lat, max_lng, max_lat)) or min_lat > max_lat:
+        return None
+    if max_lng - min_lng >= 360:
+        return -180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0)
+    wrap = lambda lng: (lng + 180.0) % 360.0 - 180.0
+    return wrap(min_lng), max(min_lat, -90.0), wrap(max_lng), min(max_lat, 90.0)
+
+@app.route('/api/clusters')
+@cached_response(conditional=True)
+def api_clusters():
+    """
+    Return service clusters (centroid and count) for a map viewport and zoom level
+
+    'zoom' in the response is the level actually clustered at, which is
+    coarser than requested when the viewport would span more than
+    CLUSTER_MAX_CELLS cells at the requested one.
+    """
+    bbox = parse_bbox(request.args.get('bbox'))
+    zoom = request.args.get('zoom', type=int)
+    if bbox is None or zoom is None:
+        return jsonify({'error': 'bbox=min_lng,min_lat,max_lng,max_lat and zoom are required'}), 400
+    
+    zoom = cluster_index.effective_zoom(bbox, zoom)
+    clusters = cluster_index.clusters(bbox, zoom, request.args.get('category') or None)
+    return jsonify({
+        'zoom': zoom,
+        'total': sum(cluster['count'] for cluster in clusters),
+        'clusters': clusters
+    })
+
+@app.route('/api/services/bbox')
+@cached_response(conditional=True)
+def api_services_bbox():
+    """
+    List publicly visible services inside a map viewport
+    
+    Query arguments:
+        bbox: min_lng,min_lat,max_lng,max_lat (required)
+        category: Only services in this category
+        limit: Result cap (default BBOX_RESULT_LIMIT, at most BBOX_MAX_RESULT_LIMIT);
+            'truncated' reports whether the viewport held more
+        fields: Fields for the JSON formats (default: id,lat,lng,category)
+        format: 'json' (list of objects), 'columnar' (one array per field), or
+            'binary': little-endian uint32 count, uint32 flags (bit 0 =
+            truncated), then uint32 id[count], float32 lat[count], float32 lng[count]
+    """
+    bbox = parse_bbox(request.args.get('bbox'))
+    if bbox is None:
+        return jsonify({'error': 'bbox=min_lng,min_lat,max_lng,max_lat is required'}), 400
+    output_format = request.args.get('format', 'json')
+    if output_format not in ('json', 'columnar', 'binary'):
+        return jsonify({'error': 'format must be json, columnar or binary'}), 400
+    fields, unknown = parse_service_fields(['id', 'lat', 'lng', 'category'])
+    if output_format == 'binary':
+        fields, unknown = ['id', 'lat', 'lng'], []
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    limit = request.args.get('limit', app.config['BBOX_RESULT_LIMIT'], type=int)
+    limit = max(1, min(limit, app.config['BBOX_MAX_RESULT_LIMIT']))
+    
+    min_lng, min_lat, max_lng, max_lat = bbox
+    statement = select(*(API_SERVICE_FIELDS[field] for field in fields)).where(
+        ServiceModel.is_approved == True, ServiceModel.is_held == False
+    )
+    category = request.args.get('category')
+    if category:
+        statement = statement.where(ServiceModel.category == category)
+    # One row past the cap tells whether the viewport was truncated
+    statement = filter_within_bbox(statement, min_lat, max_lat, min_lng, max_lng).limit(limit + 1)
+    rows = db.session.execute(statement).all()
+    truncated = len(rows) > limit
+    rows = rows[:limit]
+    
+    if output_format == 'binary':
+        count = len(rows)
+        ids, lats, lngs = zip(*rows) if rows else ((), (), ())
+        body = struct.pack(f'<II{count}I{count}f{count}f', count, int(truncated), *ids, *lats, *lngs)
+        return app.response_class(body, mimetype='application/octet-stream')
+    if output_format == 'columnar':
+        columns = dict(zip(fields, (list(column) for column in zip(*rows)))) if rows else {field: [] for field in fields}
+        return jsonify({'count': len(rows), 'truncated': truncated, 'columns': columns})
+    return jsonify({
+        'count': len(rows),
+        'truncated': truncated,
+        'services': [dict(zip(fields, row)) for row in rows]
+    })
+
+@app.route('/api/suggest')
+@cached_response(conditional=True)
+def api_suggest():
+    """Typeahead suggestions for the search box: service names, categories and localities matching a prefix"""
+    limit = min(max(request.args.get('limit', app.config['SUGGEST_LIMIT'], type=int), 1), app.config['SUGGEST_MAX_LIMIT'])
+    return jsonify(suggest_index.suggest(request.args.get('q', '')[:100], limit))
 
 @app.route('/search_nearby')
+@cached_response(conditional=True)
 def search_nearby():
     """Search for services near a specific location"""
     lat = request.args.get('lat', type=float)
@@ -695,16 +2382,21 @@ def search_nearby():
     if not lat or not lng:
         return jsonify({'error': 'Latitude and longitude are required'}), 400
     
-    # Use LocationBasedSearch strategy
-    from .search import LocationBasedSearch
-    search_strategy = LocationBasedSearch(lat, lng, max_distance)
-    search_service = SearchService(search_strategy)
-    
-    services = search_service.execute_search("", ServiceModel.query.filter_by(is_approved=True).all())
+    # R*Tree candidates measured exactly, nearest first
+    nearby = sorted(services_within_distance(lat, lng, max_distance, False).items(), key=lambda item: item[1])
+    services_by_id = {
+        service.id: service
+        for service in filter_by_ids(
+            ServiceModel.query.filter_by(is_approved=True, is_held=False), [service_id for service_id, _ in nearby]
+        )
+    }
     
     # Convert to JSON-serializable format
     services_data = []
-    for service in services:
+    for service_id, distance in nearby:
+        service = services_by_id.get(service_id)
+        if service is None:
+            continue
         service_data = {
             'id': service.id,
             'name': service.name,
@@ -714,7 +2406,7 @@ def search_nearby():
             'latitude': service.latitude,
             'longitude': service.longitude,
             'rating': service.rating,
-            'distance': getattr(service, 'distance_from_user', None)
+            'distance': distance
         }
         services_data.append(service_data)
     
@@ -724,44 +2416,258 @@ def search_nearby():
         'max_distance': max_distance
     })
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # Radius of Earth in kilometers
-
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-
-    dlon = lon2_rad - lon1_rad
-    dlat = lat2_rad - lat1_rad
-
-    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+# Unread notification counts by user ID: (count, expires_at)
+unread_notification_counts = {}
+
+def get_unread_notification_count(user_id):
+    """Return a user's unread notification count, cached until invalidated or expired"""
+    cached = unread_notification_counts.get(user_id)
+    now = datetime.utcnow()
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    count = db.session.scalar(
+        select(func.count()).select_from(Notification).where(
+            Notification.user_id == user_id, Notification.is_read == False
+        )
+    )
+    unread_notification_counts[user_id] = (count, now + timedelta(seconds=app.config['UNREAD_COUNT_CACHE_TTL']))
+    return count
+
+def invalidate_unread_notification_counts(user_ids):
+    """Drop cached unread counts after their notifications changed"""
+    for user_id in user_ids:
+        unread_notification_counts.pop(user_id, None)
+
+def create_notification(user_id, message, url=None, service_id=None):
+    """Queue a notification for one user in the current transaction (the caller commits)"""
+    create_notifications(message, url, user_ids=[user_id], service_id=service_id)
+
+def create_notifications(message, url=None, user_ids=None, role=None, service_id=None):
+    """
+    Queue one notification for a set of recipients in the current transaction
+
+    The events go to the notification outbox, so they commit atomically with
+    the caller's change while delivery happens later in the outbox worker.
+    A role is stored as a single event and only expanded to users on delivery.
+
+    Args:
+        message (str): Notification text
+        url (str): Link opened from the notification (optional)
+        user_ids (Iterable[int]): Explicit recipients
+        role (str): Role whose members all receive the notification
+        service_id (int): Service the notification is about (optional)
+    """
+    now = datetime.utcnow()
+    events = [{'recipient_role': role} for role in ([role] if role is not None else [])]
+    events += [{'user_id': user_id} for user_id in (user_ids or [])]
+    if not events:
+        return
+    db.session.execute(insert(NotificationOutbox), [
+        dict(event, message=message, url=url, service_id=service_id, created_at=now, attempts=0, available_at=now)
+        for event in events
+    ])
+    db.session.info['outbox_pending'] = True
+
+def materialize_notifications(outbox_events):
+    """
+    Write the Notification rows for delivered outbox events in the current transaction
+
+    Events for individual users are written with a single executemany; each
+    role event is resolved and written by one INSERT ... SELECT.
+
+    Returns:
+        list: Dicts describing the created notifications, for the unread counts and live observers
+    """
+    returned_columns = (Notification.id, Notification.user_id, Notification.message,
+                        Notification.url, Notification.created_at)
+    created = []
+    user_rows = [
+        {'user_id': outbox_event.user_id, 'message': outbox_event.message, 'url': outbox_event.url,
+         'service_id': outbox_event.service_id, 'is_read': False, 'created_at': outbox_event.created_at}
+        for outbox_event in outbox_events if outbox_event.user_id is not None
+    ]
+    if user_rows:
+        created += db.session.execute(insert(Notification).returning(*returned_columns), user_rows).all()
+
+    for outbox_event in outbox_events:
+        if outbox_event.recipient_role is None:
+            continue
+        recipients = select(
+            User.id, literal(outbox_event.message), literal(outbox_event.url),
+            literal(outbox_event.service_id, Integer), literal(False), literal(outbox_event.created_at)
+        ).where(User.role == outbox_event.recipient_role)
+        created += db.session.execute(
+            insert(Notification).from_select(
+                ['user_id', 'message', 'url', 'service_id', 'is_read', 'created_at'], recipients
+            ).returning(*returned_columns)
+        ).all()
+
+    return [notification_event(row) for row in created]
+
+def notification_event(row):
+    """Describe a notification row for live streams"""
+    return {
+        'id': row.id,
+        'user_id': row.user_id,
+        'message': row.message,
+        'url': row.url,
+        'created_at': row.created_at.isoformat()
+    }
+
+def claim_outbox_events(batch_size, now):
+    """
+    Take ownership of a batch of due outbox events
+
+    The events are picked and leased in one UPDATE ... RETURNING, which
+    holds SQLite's write lock, so concurrent drainers (the in-process
+    workers of several web processes, or `flask drain-outbox`) never
+    claim the same event. The lease pushes available_at past
+    OUTBOX_CLAIM_TIMEOUT; its exact value identifies the claim, so an event
+    whose lease expired and was taken over is not finished twice.
+
+    Returns:
+        tuple: (lease value, rows of the claimed events in ID order)
+    """
+    lease = now + timedelta(seconds=app.config['OUTBOX_CLAIM_TIMEOUT'])
+    due = select(NotificationOutbox.id).where(
+        NotificationOutbox.available_at <= now,
+        NotificationOutbox.attempts < app.config['OUTBOX_MAX_ATTEMPTS']
+    ).order_by(NotificationOutbox.id).limit(batch_size).scalar_subquery()
+    events = db.session.execute(
+        update(NotificationOutbox).where(NotificationOutbox.id.in_(due)).values(available_at=lease).returning(
+            NotificationOutbox.id, NotificationOutbox.user_id, NotificationOutbox.recipient_role,
+            NotificationOutbox.message, NotificationOutbox.url, NotificationOutbox.service_id,
+            NotificationOutbox.created_at, NotificationOutbox.attempts
+        ).execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return lease, sorted(events, key=lambda outbox_event: outbox_event.id)
+
+def drain_notification_outbox(batch_size=100):
+    """
+    Deliver one batch of outbox events
+
+    The batch is claimed first (see claim_outbox_events), and each event
+    is handed to the notification observers (email/SMS channels) outside
+    any transaction. Delivered events this drainer still owns are then
+    deleted and materialized as Notification rows in one commit, after
+    which live streams are told to poll for the new rows. An event whose
+    delivery raises is retried with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS. Delivery is at-least-once.
+
+    Returns:
+        int: Number of events processed (delivered or rescheduled)
+    """
+    now = datetime.utcnow()
+    lease, events = claim_outbox_events(batch_size, now)
+    if not events:
+        return 0
+
+    delivered, failed = [], []
+    for outbox_event in events:
+        try:
+            notification_service.notify_observers(outbox_event.message, {
+                'user_id': outbox_event.user_id,
+                'role': outbox_event.recipient_role,
+                'url': outbox_event.url
+            })
+        except Exception as error:
+            attempts = outbox_event.attempts + 1
+            failed.append({'id': outbox_event.id, 'attempts': attempts, 'last_error': str(error),
+                           'available_at': now + timedelta(seconds=min(2 ** attempts, 300))})
+        else:
+            delivered.append(outbox_event)
+
+    owned = NotificationOutbox.available_at == lease
+    created = []
+    if delivered:
+        # Only events still under this drainer's lease are finished here
+        deleted_ids = set(db.session.scalars(
+            delete(NotificationOutbox).where(
+                NotificationOutbox.id.in_([outbox_event.id for outbox_event in delivered]), owned
+            ).returning(NotificationOutbox.id).execution_options(synchronize_session=False)
+        ))
+        created = materialize_notifications(
+            [outbox_event for outbox_event in delivered if outbox_event.id in deleted_ids]
+        )
+    for retry in failed:
+        db.session.execute(
+            update(NotificationOutbox).where(NotificationOutbox.id == retry['id'], owned).values(
+                attempts=retry['attempts'], last_error=retry['last_error'], available_at=retry['available_at']
+            ).execution_options(synchronize_session=False)
+        )
+    db.session.commit()
 
-    distance = R * c
-    return distance
+    if created:
+        invalidate_unread_notification_counts({notification['user_id'] for notification in created})
+        live_notifications.notify_observers('Notifications created', {'notifications': created})
+    return len(events)
 
-def create_notification(user_id, message, url=None):
-    notification = Notification(user_id=user_id, message=message, url=url)
-    db.session.add(notification)
-    db.session.commit()
+def drain_outbox_in_app_context(batch_size):
+    with app.app_context():
+        return drain_notification_outbox(batch_size)
+
+outbox_worker = OutboxWorker(
+    drain_outbox_in_app_context,
+    interval=app.config['OUTBOX_POLL_INTERVAL'],
+    batch_size=app.config['OUTBOX_BATCH_SIZE']
+)
+
+@event.listens_for(db.session, 'after_commit')
+def wake_outbox_worker(session):
+    if session.info.pop('outbox_pending', False):
+        outbox_worker.wake()
+
+@app.before_request
+def ensure_background_workers():
+    if app.config['OUTBOX_WORKER_IN_PROCESS'] and not outbox_worker.is_running:
+        outbox_worker.start()
+    if app.config['NOTIFICATION_STREAM_ENABLED'] and not notification_hub.is_running:
+        notification_hub.start()
+
+@app.route('/notifications/stream_token')
+@login_required
+def notification_stream_token():
+    """Issue a signed token and URL for opening the live notification stream"""
+    if not app.config['NOTIFICATION_STREAM_ENABLED']:
+        return jsonify({'error': 'Live notifications are disabled'}), 404
+    token = stream_token_serializer.dumps(current_user.id)
+    stream_url = app.config['NOTIFICATION_STREAM_URL']
+    if not stream_url:
+        hostname = urlsplit(request.host_url).hostname
+        if ':' in hostname:
+            hostname = f'[{hostname}]'
+        # The hub serves plain HTTP whatever the scheme of this request
+        stream_url = f"http://{hostname}:{notification_hub.port}{notification_hub.path}"
+    return jsonify({'url': f'{stream_url}?token={token}'})
 
 @app.route('/notifications')
 @login_required
 def notifications():
     # Mark all as read
-    for notification in current_user.notifications:
-        notification.is_read = True
+    db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read == False)
+        .values(is_read=True)
+    )
     db.session.commit()
-    return render_template('notifications.html', notifications=current_user.notifications)
+    invalidate_unread_notification_counts([current_user.id])
+    user_notifications = Notification.query.filter_by(user_id=current_user.id).order_by(
+        Notification.created_at.desc()
+    ).all()
+    return render_template('notifications.html', notifications=user_notifications)
 
 @app.context_processor
 def inject_notifications():
     if current_user.is_authenticated:
-        notifications = sorted(current_user.notifications, key=lambda n: n.created_at, reverse=True)[:10]
+        notifications = Notification.query.filter_by(user_id=current_user.id).order_by(
+            Notification.created_at.desc()
+        ).limit(10).all()
+        unread_count = get_unread_notification_count(current_user.id)
     else:
         notifications = []
-    return dict(top_notifications=notifications)
+        unread_count = 0
+    return dict(top_notifications=notifications, unread_count=unread_count)
 
 @app.route('/notification/<int:notification_id>/mark_read', methods=['POST'])
 @login_required
@@ -771,6 +2677,7 @@ def mark_notification_read(notification_id):
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     notification.is_read = True
     db.session.commit()
+    invalidate_unread_notification_counts([current_user.id])
     return jsonify({'success': True})
 
 @app.route('/notification/<int:notification_id>/mark_unread', methods=['POST'])
@@ -781,6 +2688,7 @@ def mark_notification_unread(notification_id):
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     notification.is_read = False
     db.session.commit()
+    invalidate_unread_notification_counts([current_user.id])
     return jsonify({'success': True})
 
 @app.route('/notification/<int:notification_id>/delete', methods=['POST'])
@@ -791,6 +2699,7 @@ def delete_notification(notification_id):
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     db.session.delete(notification)
     db.session.commit()
+    invalidate_unread_notification_counts([current_user.id])
     return jsonify({'success': True})
 
 @app.route('/notifications/clear', methods=['POST'])
@@ -798,12 +2707,110 @@ def delete_notification(notification_id):
 def clear_notifications():
     Notification.query.filter_by(user_id=current_user.id).delete()
     db.session.commit()
+    invalidate_unread_notification_counts([current_user.id])
     return jsonify({'success': True})
 
+@app.cli.command('db-upgrade')
+@click.option('--target', type=int, help='Stop after this schema version.')
+@click.option('--batch-size', type=int, help='Rows per backfill batch.')
+@click.option('--pause', type=float, help='Seconds to pause between backfill batches.')
+def db_upgrade_command(target, batch_size, pause):
+    """Apply pending schema migrations (safe against a running application)."""
+    applied = schema_migrations.upgrade(
+        db.engine, target=target,
+        batch_size=batch_size or app.config['MIGRATION_BATCH_SIZE'],
+        pause=app.config['MIGRATION_BATCH_PAUSE'] if pause is None else pause
+    )
+    print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(map(str, applied))}" if applied else ''))
+
+@app.cli.command('db-status')
+def db_status_command():
+    """List schema migrations and whether each has been applied."""
+    for migration in schema_migrations.status(db.engine):
+        print(f"{migration['version']:>4}  {migration['state']:<11}  {migration['description']}")
+
+@app.cli.command('reconcile-ratings')
+def reconcile_ratings_command():
+    """Recompute review counts and average ratings from the review table."""
+    corrected = reconcile_rating_aggregates()
+    db.session.commit()
+    print(f"Rating aggregates corrected for {corrected} service(s)")
+
+@app.cli.command('backfill-hours')
+def backfill_hours_command():
+    """Rebuild the opening hours index from every service's hours text."""
+    unrecognized = backfill_service_hours()
+    db.session.commit()
+    indexed = db.session.query(func.count(func.distinct(ServiceHours.service_id))).scalar()
+    print(f"Opening hours indexed for {indexed} service(s)")
+    for service_id, hours in unrecognized:
+        print(f"  Service {service_id}: hours not recognized: {hours!r}")
+
+@app.cli.command('import-services')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='File format (default: from the extension).')
+@click.option('--provider', help='Username of the provider who will own the services.')
+@click.option('--approve', is_flag=True, help='Publish the services without admin approval.')
+def import_services_command(path, fmt, provider, approve):
+    """Bulk import services from a CSV or JSON Lines file."""
+    fmt = import_format(path, fmt)
+    if fmt not in IMPORT_FORMATS:
+        raise click.UsageError('Use a .csv or .jsonl file, or pass --format')
+    provider_id = None
+    if provider:
+        owner = User.query.filter_by(username=provider, role='provider').first()
+        if owner is None:
+            raise click.UsageError(f'No provider named {provider!r}')
+        provider_id = owner.id
+
+    def progress(report):
+        print(f"  {report.read} read, {report.inserted} inserted, {report.duplicates} duplicate(s), "
+              f"{report.rejected} rejected ({report.rows_per_second:.0f} rows/s)")
+
+    report = ImportReport(max_rejects=app.config['IMPORT_MAX_REPORTED_REJECTS'])
+    with open(path, encoding='utf-8-sig', newline='') as stream, app.test_request_context():
+        import_services(read_records(stream, fmt), report, provider_id=provider_id, approve=approve,
+                        notify_url=url_for('dashboard'), on_batch=progress)
+    print(f"Imported {report.inserted} of {report.read} row(s) in {report.elapsed:.1f}s "
+          f"({report.rows_per_second:.0f} rows/s): {report.duplicates} duplicate(s), {report.rejected} rejected")
+    for reject in report.rejects:
+        print(f"  Line {reject['line']}: {reject['reason']}")
+    if report.rejected > len(report.rejects):
+        print(f"  ... and {report.rejected - len(report.rejects)} more rejected row(s)")
+
+@app.cli.command('export')
+@click.argument('dataset', type=click.Choice(list(EXPORT_COLUMNS)))
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='csv', help='Output format (default: csv).')
+@click.option('--output', '-o', type=click.File('wb'), default='-', help='File to write (default: standard output).')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip-compress the output.')
+@click.option('--all', 'include_unlisted', is_flag=True, help='Include services that are not publicly visible.')
+def export_command(dataset, fmt, output, compress, include_unlisted):
+    """Write a full export of services or reviews."""
+    error = export_error(dataset, fmt)
+    if error:
+        raise click.UsageError(error)
+    for chunk in export_data(dataset, fmt, include_unlisted, compress):
+        output.write(chunk)
+
+@app.cli.command('drain-outbox')
+@click.option('--once', is_flag=True, help='Deliver everything currently queued, then exit.')
+def drain_outbox_command(once):
+    """Deliver queued notifications as a standalone worker process."""
+    if once:
+        total = 0
+        while True:
+            processed = drain_notification_outbox(app.config['OUTBOX_BATCH_SIZE'])
+            total += processed
+            if processed < app.config['OUTBOX_BATCH_SIZE']:
+                break
+        print(f"Processed {total} outbox event(s)")
+    else:
+        outbox_worker.run()
+
 if __name__ == '__main__':
     # Create database tables
     with app.app_context():
-        db.create_all()
+        init_database()
         
         # Create admin user if it doesn't exist
         if not User.query.filter_by(role='admin').first():
@@ -885,6 +2892,8 @@ if __name__ == '__main__':
                 service = ServiceModel(**service_data)
                 db.session.add(service)
             
+            db.session.flush()
+            backfill_service_hours()
             db.session.commit()
             print("Sample services added to database")
     
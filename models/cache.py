@@ -0,0 +1,145 @@
+"""
+Response cache with pluggable storage backends
+Caches rendered responses under keys that include a catalogue version, so a
+single version bump invalidates every cached page after a write
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class CacheBackend(ABC):
+    """Abstract storage backend for cached values"""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        pass
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, expiring after ttl seconds (backend default if None)"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: Hashable):
+        """Remove a value if present"""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove every value"""
+        pass
+
+class LocalLRUCache(CacheBackend):
+    """
+    In-process cache bounded by entry count, evicting least recently used first
+
+    Entries also expire after a TTL. Expired entries are dropped lazily when
+    read or when they reach the LRU end, so no background sweeper is needed.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            ttl (float): Default seconds before an entry expires
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict: Entry count, hits and misses
+        """
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+class ResponseCache:
+    """
+    Versioned cache of rendered responses
+
+    Every key is combined with the current catalogue version. Writers call
+    bump_version() after changing the catalogue; entries cached under older
+    versions are never read again and age out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        """
+        Initialize the response cache
+
+        Args:
+            backend (CacheBackend): Storage for cached responses
+        """
+        self.backend = backend
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def bump_version(self) -> int:
+        """
+        Invalidate every cached response
+
+        Returns:
+            int: The new catalogue version
+        """
+        with self._lock:
+            self.version += 1
+            return self.version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the response cached for key under the current version"""
+        return self.backend.get((self.version, key))
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None):
+        """
+        Cache a response
+
+        Args:
+            key: Request key
+            value: Response data to cache
+            version (int): Catalogue version the response was built from; a
+                response rendered before a concurrent bump is stored under the
+                old version so it is never served afterwards
+        """
+        self.backend.set((self.version if version is None else version, key), value)
@@ -0,0 +1,195 @@
+"""
+Grid clustering index for the service maps
+Pre-aggregates publicly visible services into Web Mercator grid cells for
+every zoom level, so a map viewport is answered with one centroid per cell
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_LATITUDE = 85.05112878  # Web Mercator cut-off
+
+class ClusterIndex:
+    """
+    In-memory per-zoom grid of service counts and coordinate sums
+
+    Each zoom level divides the world into square cells of cell_size pixels
+    (256-pixel tiles). A cell keeps, per category, [count, sum of latitudes,
+    sum of longitudes, sum of service IDs]: adding or removing a service is
+    O(zoom levels), a centroid is the sums divided by the count, and a cell
+    holding a single service yields that service's ID as the ID sum.
+    """
+
+    def __init__(self, max_zoom: int = 16, cell_size: int = 64, max_cells: int = 4096):
+        """
+        Initialize the cluster index
+
+        Args:
+            max_zoom (int): Deepest zoom level indexed; deeper queries use it
+            cell_size (int): Cell width in screen pixels
+            max_cells (int): Most grid cells one viewport may span; a larger
+                viewport is answered at a coarser zoom, bounding the clusters returned
+        """
+        self.max_zoom = max_zoom
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._levels: List[Dict[Tuple[int, int], Dict[str, List[float]]]] = [{} for _ in range(max_zoom + 1)]
+        self._points: Dict[int, Tuple[float, float, str]] = {}
+        self._lock = threading.Lock()
+        self.is_loaded = False
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def load(self, points: Iterable[Tuple[int, float, float, str]]):
+        """
+        Replace the index contents
+
+        Args:
+            points: Iterable of (service_id, latitude, longitude, category) tuples
+        """
+        with self._lock:
+            self._levels = [{} for _ in range(self.max_zoom + 1)]
+            self._points = {}
+            for service_id, latitude, longitude, category in points:
+                if latitude is None or longitude is None:
+                    continue
+                self._add(service_id, latitude, longitude, category.lower())
+            self.is_loaded = True
+
+    def upsert(self, service_id: int, latitude: float, longitude: float, category: str):
+        """Add a service or move it to new coordinates or category"""
+        with self._lock:
+            self._discard(service_id)
+            self._add(service_id, latitude, longitude, category.lower())
+
+    def remove(self, service_id: int) -> bool:
+        """
+        Remove a service
+
+        Returns:
+            bool: True if the service was indexed
+        """
+        with self._lock:
+            return self._discard(service_id)
+
+    def effective_zoom(self, bbox: Tuple[float, float, float, float], zoom: int) -> int:
+        """
+        Zoom level a viewport is clustered at
+
+        The requested zoom, limited to the indexed levels and lowered until
+        the viewport spans at most max_cells cells (each level down quarters
+        the count), so a world-sized bbox at a deep zoom cannot return one
+        cluster per service.
+        """
+        zoom = max(0, min(zoom, self.max_zoom))
+        while zoom > 0 and self._cell_count(self._viewport(bbox, zoom), zoom) > self.max_cells:
+            zoom -= 1
+        return zoom
+
+    def clusters(self, bbox: Tuple[float, float, float, float], zoom: int,
+                 category: Optional[str] = None) -> List[Dict]:
+        """
+        Get the clusters whose cells intersect a viewport
+
+        Args:
+            bbox: (min_lng, min_lat, max_lng, max_lat) in degrees; min_lng >
+                  max_lng denotes a viewport crossing the antimeridian
+            zoom (int): Map zoom level (see effective_zoom)
+            category (str): Only count services in this category (optional)
+
+        Returns:
+            List: Dicts with 'lat', 'lng' and 'count', plus 'id' for single services
+        """
+        zoom = self.effective_zoom(bbox, zoom)
+        viewport = self._viewport(bbox, zoom)
+        x_min, x_max, y_min, y_max, wraps = viewport
+        category = category.lower() if category else None
+
+        results = []
+        with self._lock:
+            level = self._levels[zoom]
+            if self._cell_count(viewport, zoom) <= len(level):
+                # Small viewport: probe its cells directly
+                xs = range(x_min, x_max + 1) if not wraps else \
+                    list(range(x_min, self._cells_per_axis(zoom))) + list(range(0, x_max + 1))
+                cells = ((cell, level.get(cell)) for cell in ((x, y) for x in xs for y in range(y_min, y_max + 1)))
+            else:
+                cells = (
+                    (cell, stats) for cell, stats in level.items()
+                    if y_min <= cell[1] <= y_max
+                    and ((x_min <= cell[0] or cell[0] <= x_max) if wraps else x_min <= cell[0] <= x_max)
+                )
+
+            for cell, stats in cells:
+                if not stats:
+                    continue
+                if category is not None:
+                    totals = stats.get(category)
+                    if totals is None:
+                        continue
+                else:
+                    totals = [sum(values) for values in zip(*stats.values())]
+                count, sum_lat, sum_lng, sum_id = totals
+                cluster = {'lat': sum_lat / count, 'lng': sum_lng / count, 'count': int(count)}
+                if count == 1:
+                    cluster['id'] = int(sum_id)
+                results.append(cluster)
+        return results
+
+    def _cells_per_axis(self, zoom: int) -> int:
+        return (256 << zoom) // self.cell_size
+
+    def _viewport(self, bbox: Tuple[float, float, float, float], zoom: int) -> Tuple[int, int, int, int, bool]:
+        """Cell range (x_min, x_max, y_min, y_max, wraps) covered by a bbox at a zoom level"""
+        min_lng, min_lat, max_lng, max_lat = bbox
+        x_min, y_max = self._cell(min_lat, min_lng, zoom)
+        x_max, y_min = self._cell(max_lat, max_lng, zoom)
+        return x_min, x_max, y_min, y_max, min_lng > max_lng
+
+    def _cell_count(self, viewport: Tuple[int, int, int, int, bool], zoom: int) -> int:
+        """Number of cells in a viewport's cell range"""
+        x_min, x_max, y_min, y_max, wraps = viewport
+        columns = (self._cells_per_axis(zoom) - x_min + x_max + 1) if wraps else (x_max - x_min + 1)
+        return columns * (y_max - y_min + 1)
+
+    def _cell(self, latitude: float, longitude: float, zoom: int) -> Tuple[int, int]:
+        """Grid cell containing a point at a zoom level"""
+        n = self._cells_per_axis(zoom)
+        lat_rad = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude)))
+        x = (longitude + 180.0) / 360.0 * n
+        y = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n
+        return min(max(int(x), 0), n - 1), min(max(int(y), 0), n - 1)
+
+    def _add(self, service_id: int, latitude: float, longitude: float, category: str):
+        """Add a service's contribution to every level (caller holds the lock)"""
+        self._points[service_id] = (latitude, longitude, category)
+        for zoom, level in enumerate(self._levels):
+            stats = level.setdefault(self._cell(latitude, longitude, zoom), {})
+            totals = stats.setdefault(category, [0, 0.0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += latitude
+            totals[2] += longitude
+            totals[3] += service_id
+
+    def _discard(self, service_id: int) -> bool:
+        """Subtract a service's contribution from every level (caller holds the lock)"""
+        point = self._points.pop(service_id, None)
+        if point is None:
+            return False
+        latitude, longitude, category = point
+        for zoom, level in enumerate(self._levels):
+            cell = self._cell(latitude, longitude, zoom)
+            stats = level[cell]
+            totals = stats[category]
+            if totals[0] == 1:
+                del stats[category]
+                if not stats:
+                    del level[cell]
+                continue
+            totals[0] -= 1
+            totals[1] -= latitude
+            totals[2] -= longitude
+            totals[3] -= service_id
+        return True
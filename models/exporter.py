@@ -0,0 +1,103 @@
+"""
+Streaming writers for bulk exports
+Turn chunks of database rows into CSV, JSON Lines or GeoJSON text one chunk at
+a time, optionally gzip-compressed on the fly, so dumps never sit in memory
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Sequence
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'geojson')
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'geojson': 'application/geo+json'
+}
+
+def _plain(value: Any) -> Any:
+    """JSON-friendly form of a column value (datetimes become ISO 8601 strings)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def write_csv(columns: Sequence[str], chunks: Iterable[List[Sequence]]) -> Iterator[str]:
+    """
+    Write row chunks as CSV with a header row
+
+    Args:
+        columns (Sequence): Column names, in row order
+        chunks: Iterable of lists of rows
+
+    Yields:
+        str: The header, then the text of one chunk at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows([_plain(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def write_jsonl(columns: Sequence[str], chunks: Iterable[List[Sequence]]) -> Iterator[str]:
+    """Write row chunks as JSON Lines, one object per row"""
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + '\n' for row in chunk
+        )
+
+def write_geojson(columns: Sequence[str], chunks: Iterable[List[Sequence]]) -> Iterator[str]:
+    """
+    Write row chunks as a GeoJSON FeatureCollection of points
+
+    Rows must have 'latitude' and 'longitude' columns; they become the
+    geometry (null when either is missing) and the other columns the
+    feature's properties.
+    """
+    latitude, longitude = columns.index('latitude'), columns.index('longitude')
+    properties = [index for index in range(len(columns)) if index not in (latitude, longitude)]
+    separator = ''
+    yield '{"type": "FeatureCollection", "features": ['
+    for chunk in chunks:
+        features = []
+        for row in chunk:
+            has_point = row[latitude] is not None and row[longitude] is not None
+            features.append(json.dumps({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [row[longitude], row[latitude]]} if has_point else None,
+                'properties': {columns[index]: _plain(row[index]) for index in properties}
+            }))
+        if features:
+            yield separator + ',\n'.join(features)
+            separator = ',\n'
+    yield ']}\n'
+
+EXPORT_WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'geojson': write_geojson}
+
+def encode_chunks(chunks: Iterable[str], compress: bool = False, level: int = 6) -> Iterator[bytes]:
+    """
+    Encode text chunks as UTF-8, optionally as one gzip stream
+
+    Args:
+        chunks: Iterable of text chunks
+        compress (bool): Gzip the output incrementally
+        level (int): Compression level (1-9)
+
+    Yields:
+        bytes: Encoded chunks (empty ones are skipped)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
@@ -144,21 +144,19 @@ class UserInterfaceFacade:
         Returns:
             Dict: Search results with detailed information and map data
         """
-        # Get all services from registry
-        all_services = self.service_registry.get_services()
+        # Only publicly visible services, read from the registry's visibility index
+        candidates = self.service_registry.get_approved_services()
         
         # Apply search strategy based on category
         if category:
-            from .search import CategorySearch
             self.search_service.set_strategy(CategorySearch())
             search_query = category
         else:
-            from .search import LocationSearch
             self.search_service.set_strategy(LocationSearch())
             search_query = query
         
         # Execute search
-        filtered_services = self.search_service.execute_search(search_query, all_services)
+        filtered_services = self.search_service.execute_search(search_query, candidates)
         
         # Get detailed information for each service
         detailed_services = []
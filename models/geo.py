@@ -0,0 +1,67 @@
+"""
+Geographic helpers shared by the search endpoints
+Provides the haversine distance and bounding-box calculation used by proximity searches
+"""
+
+import math
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculate the great-circle distance between two points
+
+    Args:
+        lat1 (float): Latitude of the first point in degrees
+        lon1 (float): Longitude of the first point in degrees
+        lat2 (float): Latitude of the second point in degrees
+        lon2 (float): Longitude of the second point in degrees
+
+    Returns:
+        float: Distance in kilometers
+    """
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = math.radians(lon2 - lon1)
+
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Calculate the smallest lat/lng rectangle containing a search circle
+
+    Every point within radius_km of (lat, lon) lies inside the returned box,
+    so it can be used as an index prefilter before exact distance checks.
+    Boxes touching a pole or crossing the antimeridian span all longitudes.
+
+    Args:
+        lat (float): Latitude of the circle centre
+        lon (float): Longitude of the circle centre
+        radius_km (float): Circle radius in kilometers
+
+    Returns:
+        Tuple: (min_lat, max_lat, min_lon, max_lon) in degrees
+    """
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    delta_lat = math.degrees(angular_radius)
+    min_lat = lat - delta_lat
+    max_lat = lat + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    ratio = math.sin(angular_radius) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return min_lat, max_lat, -180.0, 180.0
+
+    delta_lon = math.degrees(math.asin(ratio))
+    min_lon = lon - delta_lon
+    max_lon = lon + delta_lon
+
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+
+    return min_lat, max_lat, min_lon, max_lon
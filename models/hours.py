@@ -0,0 +1,183 @@
+"""
+Opening hours parsing
+Turns free-text schedules such as "Mon-Fri 9AM-5PM, Sat 10AM-2PM" or "24/7"
+into weekly intervals that can be stored and queried with an index
+"""
+
+import re
+from datetime import datetime
+from typing import List, Set, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAY_NAMES = {
+    'mon': 0, 'monday': 0, 'tue': 1, 'tues': 1, 'tuesday': 1, 'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3, 'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5, 'sun': 6, 'sunday': 6
+}
+DAY_GROUPS = {
+    'daily': range(7), 'everyday': range(7), 'weekdays': range(5), 'weekends': range(5, 7)
+}
+
+_DAY = '|'.join(sorted(DAY_NAMES, key=len, reverse=True))
+_TIME = r'(?:\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?m\.?)?|noon|midnight)'
+_TOKENS = re.compile(
+    rf"""
+    (?P<always>24\s*/\s*7|24\s*hours?|open\s+24\s*hours?)
+    | (?P<closed>closed)
+    | (?P<group>{'|'.join(DAY_GROUPS)}|every\s+day)\b
+    | (?P<days>(?:{_DAY})\.?(?:\s*(?:-|–|to|through)\s*(?:{_DAY})\.?)?)\b
+    | (?P<times>{_TIME}\s*(?:-|–|to|until)\s*{_TIME})
+    | (?P<separator>[\s,;&/:]+|and\b)
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+_TIME_PARTS = re.compile(r'(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?m\.?)?', re.IGNORECASE)
+_RANGE_SEPARATOR = re.compile(r'\s*(?:-|–|to|until)\s*', re.IGNORECASE)
+
+class HoursFormatError(ValueError):
+    """Raised when an opening hours text cannot be understood"""
+    pass
+
+def parse_hours(hours: str) -> List[Tuple[int, int]]:
+    """
+    Parse an opening hours text into weekly intervals
+
+    Minutes are counted from Monday 00:00. Intervals never cross midnight
+    (a "10PM-2AM" slot is split into two), so each one lies within a single
+    day; Sunday night slots wrap around to Monday.
+
+    Args:
+        hours (str): Schedule text, e.g. "Mon-Fri 9AM-5PM, Sat 10AM-2PM"
+
+    Returns:
+        List: Sorted, non-overlapping (opens, closes) minute-of-week pairs;
+              empty when the text only lists closed days
+
+    Raises:
+        HoursFormatError: If the text is blank or not understood
+    """
+    if not hours or not hours.strip():
+        raise HoursFormatError('No opening hours given')
+
+    slots: List[Tuple[int, int, int]] = []  # (day, opens, closes) in minutes of the day
+    days: Set[int] = set()
+    days_used = True  # whether the current day list already received hours
+    position = 0
+    for match in _TOKENS.finditer(hours):
+        if match.start() != position:
+            break
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'separator':
+            continue
+        if kind in ('days', 'group'):
+            if days_used:
+                days, days_used = set(), False
+            days.update(_parse_days(match.group(kind)))
+            continue
+
+        # Hours without a preceding day list apply to every day
+        target = days if days else set(range(7))
+        days_used = True
+        if kind == 'always':
+            slots.extend((day, 0, MINUTES_PER_DAY) for day in target)
+        elif kind == 'times':
+            opens, closes = _parse_time_range(match.group(kind))
+            slots.extend((day, opens, closes) for day in target)
+    if position != len(hours) or not days_used:
+        raise HoursFormatError(f'Unrecognized opening hours: {hours!r}')
+
+    return _to_week_intervals(slots)
+
+def minute_of_week(moment: datetime) -> int:
+    """
+    Position of a moment within the week, in minutes from Monday 00:00
+
+    Args:
+        moment (datetime): Local time at the services
+
+    Returns:
+        int: Minute of the week
+    """
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def is_open(intervals: List[Tuple[int, int]], minute: int) -> bool:
+    """Check whether a minute of the week falls within any interval"""
+    return any(opens <= minute < closes for opens, closes in intervals)
+
+def _parse_days(text: str) -> List[int]:
+    """Expand a day name, range ("Mon-Fri", wrapping "Fri-Mon") or group into weekday numbers"""
+    text = text.lower()
+    if text.replace(' ', '') in DAY_GROUPS:
+        return list(DAY_GROUPS[text.replace(' ', '')])
+    if text.startswith('every'):
+        return list(range(7))
+    names = [name.rstrip('.') for name in re.split(r'\s*(?:-|–|to|through)\s*', text)]
+    first = DAY_NAMES[names[0]]
+    last = DAY_NAMES[names[-1]]
+    return [(first + offset) % 7 for offset in range((last - first) % 7 + 1)]
+
+def _parse_time_range(text: str) -> Tuple[int, int]:
+    """Parse "9AM-5PM", "9:30-17:00", "9-5PM" or "9-5" into minutes of the day (closes may exceed a day)"""
+    start_text, end_text = _RANGE_SEPARATOR.split(text.strip(), maxsplit=1)
+    start, start_meridiem = _parse_time(start_text)
+    end, end_meridiem = _parse_time(end_text)
+    if start_meridiem is None and end_meridiem is not None:
+        # "9-5PM": the start shares the end's meridiem unless that would put it after the end
+        start, _ = _parse_time(f'{start_text}{end_meridiem}m')
+        if start > end and end != 0:
+            start, _ = _parse_time(f"{start_text}{'a' if end_meridiem == 'p' else 'p'}m")
+    elif start_meridiem is None and end_meridiem is None and end < start < 13 * 60:
+        # "9-5": a bare range running backwards from a morning start is 12-hour time
+        end += 12 * 60
+    if end <= start:
+        end += MINUTES_PER_DAY  # closes after midnight (or "12AM-12AM": the whole day)
+    return start, end
+
+def _parse_time(text: str) -> Tuple[int, str]:
+    """
+    Parse a single time of day
+
+    Returns:
+        Tuple: Minutes since midnight and the meridiem letter ('a', 'p' or None)
+    """
+    text = text.strip().lower()
+    if text == 'noon':
+        return 12 * 60, 'p'
+    if text == 'midnight':
+        return 0, 'a'
+    match = _TIME_PARTS.fullmatch(text)
+    if not match:
+        raise HoursFormatError(f'Unrecognized time: {text!r}')
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = match.group(3)
+    if meridiem is not None:
+        if not 1 <= hour <= 12:
+            raise HoursFormatError(f'Unrecognized time: {text!r}')
+        hour = hour % 12 + (12 if meridiem == 'p' else 0)
+    if hour > 24 or minute > 59 or (hour == 24 and minute):
+        raise HoursFormatError(f'Unrecognized time: {text!r}')
+    return hour * 60 + minute, meridiem
+
+def _to_week_intervals(slots: List[Tuple[int, int, int]]) -> List[Tuple[int, int]]:
+    """Split day slots at midnight, place them in the week and merge overlaps within each day"""
+    by_day = {}
+    for day, opens, closes in slots:
+        while opens < closes:
+            day_end = min(closes, MINUTES_PER_DAY)
+            by_day.setdefault(day % 7, []).append((opens, day_end))
+            day, opens, closes = day + 1, 0, closes - MINUTES_PER_DAY
+
+    intervals = []
+    for day, day_slots in sorted(by_day.items()):
+        merged = []
+        for opens, closes in sorted(day_slots):
+            if merged and opens <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], closes)
+            else:
+                merged.append([opens, closes])
+        offset = day * MINUTES_PER_DAY
+        intervals.extend((offset + opens, offset + closes) for opens, closes in merged)
+    return intervals
@@ -0,0 +1,161 @@
+"""
+Streaming reader and validator for bulk service imports
+Reads CSV or JSON Lines one record at a time and turns each into the column
+values of a new service listing, collecting rejects and throughput figures
+"""
+
+import csv
+import json
+import math
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Text columns accepted from an import and their maximum lengths (as in the model)
+SERVICE_TEXT_FIELDS = {
+    'name': 100, 'category': 50, 'description': None, 'address': 200,
+    'phone': 20, 'email': 120, 'hours': 200
+}
+REQUIRED_FIELDS = ('name', 'category', 'address', 'latitude', 'longitude')
+# Alternative column names found in published datasets
+FIELD_ALIASES = {'lat': 'latitude', 'lng': 'longitude', 'lon': 'longitude', 'long': 'longitude'}
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+class ImportRowError(ValueError):
+    """Raised when an import record cannot become a service listing"""
+    pass
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Read an import file one record at a time
+
+    Args:
+        stream (TextIO): Text stream positioned at the start of the file
+        fmt (str): 'csv' (with a header row) or 'jsonl' (one JSON object per line)
+
+    Yields:
+        Tuple: (line number, dict) per record, or (line number, ImportRowError)
+               for a line that is not valid JSON
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                yield line_number, ImportRowError(f'Invalid JSON: {error.msg}')
+    else:
+        raise ValueError(f'Unsupported import format: {fmt}')
+
+def validate_service(record: Any) -> Dict[str, Any]:
+    """
+    Check an import record and normalize it into service column values
+
+    Args:
+        record: Parsed CSV or JSON record
+
+    Returns:
+        Dict: Column values for a new ServiceModel row
+
+    Raises:
+        ImportRowError: If a required field is missing or a value is invalid
+    """
+    if isinstance(record, ImportRowError):
+        raise record
+    if not isinstance(record, dict):
+        raise ImportRowError('Record is not an object')
+    record = {FIELD_ALIASES.get(str(key).strip().lower(), str(key).strip().lower()): value
+              for key, value in record.items() if key is not None}
+
+    service = {}
+    for field, max_length in SERVICE_TEXT_FIELDS.items():
+        value = record.get(field)
+        value = str(value).strip() if value is not None else ''
+        if max_length is not None and len(value) > max_length:
+            raise ImportRowError(f'{field} is longer than {max_length} characters')
+        service[field] = value or None
+    if service['category']:
+        service['category'] = service['category'].lower()
+
+    for field in ('latitude', 'longitude'):
+        value = record.get(field)
+        try:
+            service[field] = float(value) if value not in (None, '') else None
+        except (TypeError, ValueError):
+            raise ImportRowError(f'{field} is not a number: {value!r}')
+        if service[field] is not None and not math.isfinite(service[field]):
+            raise ImportRowError(f'{field} is not a finite number')
+
+    missing = [field for field in REQUIRED_FIELDS if service.get(field) is None]
+    if missing:
+        raise ImportRowError(f"Missing {', '.join(missing)}")
+    if not -90 <= service['latitude'] <= 90 or not -180 <= service['longitude'] <= 180:
+        raise ImportRowError('Coordinates are out of range')
+    return service
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Group an iterable into lists of at most size items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class ImportReport:
+    """Running totals of an import: rows read, inserted, duplicates and rejects"""
+
+    def __init__(self, max_rejects: int = 100):
+        """
+        Initialize the report
+
+        Args:
+            max_rejects (int): Rejected rows listed in detail; later ones are only counted
+        """
+        self.max_rejects = max_rejects
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.rejects: List[Dict[str, Any]] = []
+        self.batches = 0
+        self._started = time.monotonic()
+        self.finished_at: Optional[float] = None
+
+    def reject(self, line: int, reason: str):
+        """Record a row that failed validation"""
+        self.rejected += 1
+        if len(self.rejects) < self.max_rejects:
+            self.rejects.append({'line': line, 'reason': reason})
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the import started"""
+        return (self.finished_at or time.monotonic()) - self._started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary suitable for JSON"""
+        return {
+            'read': self.read,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'rejects': self.rejects
+        }
@@ -0,0 +1,175 @@
+"""
+Versioned schema migrations
+Applies numbered upgrade steps in order and records them in a schema_version
+table, with resumable batched backfills so changes can ship to a live database
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_DDL = """CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR(200) NOT NULL,
+    applied_at DATETIME NOT NULL,
+    backfill_position INTEGER NOT NULL DEFAULT 0,
+    completed_at DATETIME
+)"""
+
+class Migration:
+    """
+    One schema change
+
+    upgrade runs in a single transaction together with the insertion of the
+    version row. backfill, if any, then runs in batches of its own
+    transactions: it is called with the position reached so far (0 at the
+    start) and returns the next position, or None once finished.
+    """
+
+    def __init__(self, version: int, description: str, upgrade: Callable[[Connection], None]):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.backfill: Optional[Callable[[Connection, int, int], Optional[int]]] = None
+
+class MigrationRunner:
+    """
+    Registry and runner of the application's migrations
+
+    Safe to run from several processes at once and against a database in
+    use: inserting the version row takes SQLite's write lock, so a second
+    runner waits and then finds the step applied. Upgrades must be
+    idempotent (CREATE ... IF NOT EXISTS, column existence checks) so they
+    also bring databases created before versioning up to date. Backfill
+    progress is stored after every batch, so an interrupted backfill
+    resumes where it stopped, and other writers get the lock between
+    batches.
+    """
+
+    def __init__(self):
+        self.migrations: Dict[int, Migration] = {}
+
+    def migration(self, version: int, description: str):
+        """Decorator registering an upgrade function under a version number"""
+        def decorator(upgrade: Callable[[Connection], None]):
+            if version in self.migrations:
+                raise ValueError(f'Duplicate migration version {version}')
+            self.migrations[version] = Migration(version, description, upgrade)
+            return upgrade
+        return decorator
+
+    def backfill(self, version: int):
+        """Decorator attaching a batched backfill to a registered migration"""
+        def decorator(backfill: Callable[[Connection, int, int], Optional[int]]):
+            self.migrations[version].backfill = backfill
+            return backfill
+        return decorator
+
+    @property
+    def head(self) -> int:
+        """Highest registered version"""
+        return max(self.migrations, default=0)
+
+    def status(self, engine: Engine) -> List[Dict]:
+        """
+        Get the state of every registered migration
+
+        Returns:
+            List: Dicts with 'version', 'description' and 'state' ('pending',
+                  'backfilling' or 'applied'), oldest first
+        """
+        with engine.begin() as connection:
+            connection.exec_driver_sql(SCHEMA_VERSION_DDL)
+            applied = {
+                row.version: row for row in connection.execute(
+                    text('SELECT version, completed_at FROM schema_version')
+                )
+            }
+        states = []
+        for version, migration in sorted(self.migrations.items()):
+            row = applied.get(version)
+            state = 'pending' if row is None else ('applied' if row.completed_at else 'backfilling')
+            states.append({'version': version, 'description': migration.description, 'state': state})
+        return states
+
+    def upgrade(self, engine: Engine, target: Optional[int] = None, batch_size: int = 1000,
+                pause: float = 0.0) -> List[int]:
+        """
+        Apply every pending migration up to target
+
+        Args:
+            engine (Engine): Database to migrate
+            target (int): Last version to apply (default: all)
+            batch_size (int): Rows per backfill batch
+            pause (float): Seconds to sleep between backfill batches
+
+        Returns:
+            List: Versions this call applied or finished backfilling
+        """
+        done = []
+        for state in self.status(engine):
+            version = state['version']
+            if target is not None and version > target:
+                break
+            if state['state'] == 'applied':
+                continue
+            migration = self.migrations[version]
+            if state['state'] == 'pending':
+                # If another process got there first, help finish its backfill instead
+                self._apply(engine, migration)
+            self._run_backfill(engine, migration, batch_size, pause)
+            done.append(version)
+        return done
+
+    def _apply(self, engine: Engine, migration: Migration) -> bool:
+        """Run an upgrade step; False if another process applied it first"""
+        started = time.monotonic()
+        with engine.begin() as connection:
+            claimed = connection.execute(
+                text('INSERT OR IGNORE INTO schema_version (version, description, applied_at, completed_at) '
+                     'VALUES (:version, :description, :now, :completed)'),
+                {'version': migration.version, 'description': migration.description, 'now': datetime.utcnow(),
+                 'completed': None if migration.backfill else datetime.utcnow()}
+            ).rowcount
+            if not claimed:
+                return False
+            migration.upgrade(connection)
+        logger.info("Applied migration %s (%s) in %.2fs", migration.version, migration.description,
+                    time.monotonic() - started)
+        return True
+
+    def _run_backfill(self, engine: Engine, migration: Migration, batch_size: int, pause: float):
+        """Run a migration's backfill batch by batch from its stored position, then mark it applied"""
+        if migration.backfill is None:
+            return
+        while True:
+            with engine.begin() as connection:
+                # Touching the row first takes the write lock, so concurrent runners take turns
+                connection.execute(
+                    text('UPDATE schema_version SET backfill_position = backfill_position WHERE version = :version'),
+                    {'version': migration.version}
+                )
+                position, completed_at = connection.execute(
+                    text('SELECT backfill_position, completed_at FROM schema_version WHERE version = :version'),
+                    {'version': migration.version}
+                ).one()
+                if completed_at is not None:
+                    return
+                next_position = migration.backfill(connection, position, batch_size)
+                connection.execute(
+                    text('UPDATE schema_version SET backfill_position = :position, completed_at = :completed '
+                         'WHERE version = :version'),
+                    {'version': migration.version, 'position': next_position if next_position is not None else position,
+                     'completed': datetime.utcnow() if next_position is None else None}
+                )
+            if next_position is None:
+                logger.info("Finished backfill of migration %s", migration.version)
+                return
+            if pause:
+                time.sleep(pause)
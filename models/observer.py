@@ -4,6 +4,7 @@ Enables real-time notifications about new services and updates
 """
 
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import List, Dict, Any
 from datetime import datetime
 
@@ -119,10 +120,15 @@ class ServiceObserver(Observer):
 class NotificationService:
     """Service for managing notifications and observers"""
     
-    def __init__(self):
-        """Initialize notification service"""
+    def __init__(self, history_limit: int = 1000):
+        """
+        Initialize notification service
+        
+        Args:
+            history_limit (int): Number of recent notifications kept in the history
+        """
         self.observers = []
-        self.notification_history = []
+        self.notification_history = deque(maxlen=history_limit)
     
     def add_observer(self, observer: Observer):
         """
@@ -235,7 +241,7 @@ class NotificationService:
         Returns:
             List: Notification history
         """
-        return self.notification_history
+        return list(self.notification_history)
     
     def get_observer_count(self) -> int:
         """
@@ -0,0 +1,73 @@
+"""
+Background worker for the transactional outbox
+Drains events that request handlers committed alongside their own changes,
+so delivery work never runs inside the request
+"""
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class OutboxWorker:
+    """
+    Daemon thread that repeatedly calls a drain function
+
+    The drain function processes up to batch_size pending events and returns
+    how many it handled. A full batch means more work is probably waiting, so
+    the worker drains again immediately; otherwise it sleeps for the poll
+    interval or until wake() is called.
+    """
+
+    def __init__(self, drain: Callable[[int], int], interval: float = 2.0, batch_size: int = 100):
+        """
+        Initialize the outbox worker
+
+        Args:
+            drain: Callable taking a batch size and returning the number of events processed
+            interval (float): Seconds to wait between polls when the outbox is empty
+            batch_size (int): Maximum number of events per drain call
+        """
+        self.drain = drain
+        self.interval = interval
+        self.batch_size = batch_size
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread if it isn't already running"""
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self.run, name='outbox-worker', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Ask the worker thread to exit and wait for it"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """Drain as soon as possible instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    def run(self):
+        """Drain the outbox until stopped (also usable in the foreground)"""
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                processed = self.drain(self.batch_size)
+            except Exception:
+                logger.exception("Outbox drain failed")
+                processed = 0
+            if processed < self.batch_size:
+                self._wakeup.wait(self.interval)
@@ -0,0 +1,230 @@
+"""
+Observer Pattern extension for live notifications
+NotificationHub is an observer that pushes new notifications to connected
+browsers over Server-Sent Events, served from a dedicated asyncio event loop
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .observer import Observer
+
+logger = logging.getLogger(__name__)
+
+class NotificationHub(Observer):
+    """
+    Database poller streaming new notifications to subscribed users
+
+    Each open stream is a coroutine waiting on its own small queue, so an
+    idle connection costs a socket and a few objects rather than a thread.
+    Notifications are found by polling the database past an ID high-water
+    mark, so those created by any process (a separate outbox worker, other
+    web workers) reach the streams; update() from an in-process writer
+    only triggers the next poll early, handing the wake-up to the loop with
+    call_soon_threadsafe.
+    """
+
+    def __init__(self, authenticate: Callable[[str], Optional[int]],
+                 fetch: Callable[[Optional[int], Iterable[int]], Tuple[int, List[Dict[str, Any]]]],
+                 host: str = '127.0.0.1', port: int = 5002, path: str = '/notifications/stream',
+                 allow_origin: str = '*', heartbeat: float = 25.0, queue_size: int = 100,
+                 poll_interval: float = 1.0):
+        """
+        Initialize the hub
+
+        Args:
+            authenticate: Callable mapping a stream token to a user ID (None if invalid)
+            fetch: Callable taking the high-water notification ID (None at first) and
+                the subscribed user IDs, returning the new high-water ID and the
+                notifications after the old one for those users, in ID order
+            host (str): Interface the SSE server binds to
+            port (int): Port the SSE server listens on
+            path (str): URL path of the stream endpoint
+            allow_origin (str): Value of the Access-Control-Allow-Origin header
+            heartbeat (float): Seconds between keep-alive comments on idle streams
+            queue_size (int): Events buffered per connection before new ones are dropped
+            poll_interval (float): Seconds between polls for new notifications
+        """
+        self.authenticate = authenticate
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.host = host
+        self.port = port
+        self.path = path
+        self.allow_origin = allow_origin
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._poll_now: Optional[asyncio.Event] = None
+        self._high_water: Optional[int] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the event loop thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def connection_count(self) -> int:
+        """Number of open streams"""
+        return sum(len(queues) for queues in list(self._subscribers.values()))
+
+    def start(self, timeout: float = 5.0):
+        """Start the event loop thread and SSE server if not already running"""
+        if self.is_running:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='notification-hub', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+
+    def stop(self, timeout: float = None):
+        """Close the server and stop the event loop"""
+        if self._loop is not None and self.is_running:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+
+    def update(self, message: str, data: Any = None):
+        """
+        Observer hook: notifications were just committed, so poll for them now
+
+        Args:
+            message (str): Event description (unused by the stream)
+            data (Any): Details of the notifications (unused; the poll reads them)
+        """
+        if self._loop is not None and self._poll_now is not None:
+            self._loop.call_soon_threadsafe(self._poll_now.set)
+
+    async def _poll_forever(self):
+        """Deliver notifications created since the last poll (runs on the loop)"""
+        while True:
+            try:
+                await asyncio.wait_for(self._poll_now.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._poll_now.clear()
+            try:
+                # The database call runs on the default executor so streams keep flowing
+                self._high_water, notifications = await asyncio.get_running_loop().run_in_executor(
+                    None, self.fetch, self._high_water, list(self._subscribers)
+                )
+            except Exception:
+                logger.exception("Polling for live notifications failed")
+                continue
+            for notification in notifications:
+                self._deliver(notification['user_id'], json.dumps(notification, default=str))
+
+    def _deliver(self, user_id: int, event: str):
+        """Queue an event on each of the user's streams (runs on the loop)"""
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client misses live events; it still sees them on the next page load
+                pass
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port)
+            )
+        except OSError:
+            logger.exception("Notification stream could not listen on %s:%s", self.host, self.port)
+            self._ready.set()
+            loop.close()
+            return
+        self._loop = loop
+        self._poll_now = asyncio.Event()
+        loop.create_task(self._poll_forever())
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop = None
+            # Cancel open streams so their cleanup runs before the loop closes
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        user_id = None
+        queue = None
+        disconnected = None
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            # Skip the request headers; authentication travels in the query string
+            while (await asyncio.wait_for(reader.readline(), timeout=10)) not in (b'\r\n', b'\n', b''):
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self._respond(writer, '405 Method Not Allowed')
+                return
+            url = urlsplit(parts[1])
+            if url.path != self.path:
+                await self._respond(writer, '404 Not Found')
+                return
+            token = parse_qs(url.query).get('token', [None])[0]
+            user_id = self.authenticate(token) if token else None
+            if user_id is None:
+                await self._respond(writer, '401 Unauthorized')
+                return
+
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self._subscribers.setdefault(user_id, set()).add(queue)
+            writer.write((
+                'HTTP/1.1 200 OK\r\n'
+                'Content-Type: text/event-stream\r\n'
+                'Cache-Control: no-cache\r\n'
+                'Connection: keep-alive\r\n'
+                f'Access-Control-Allow-Origin: {self.allow_origin}\r\n'
+                '\r\n'
+                'retry: 5000\n\n'
+            ).encode())
+            await writer.drain()
+
+            # Clients never send after the request, so any read completing means they hung up
+            disconnected = asyncio.ensure_future(reader.read(1))
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(queue.get())
+                await asyncio.wait({next_event, disconnected}, timeout=self.heartbeat,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if next_event.done():
+                    writer.write(f'event: notification\ndata: {next_event.result()}\n\n'.encode())
+                else:
+                    next_event.cancel()
+                    if disconnected.done():
+                        break
+                    writer.write(b': keep-alive\n\n')
+                await writer.drain()
+        except (asyncio.TimeoutError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            if disconnected is not None:
+                disconnected.cancel()
+            if queue is not None:
+                queues = self._subscribers.get(user_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[user_id]
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: str):
+        """Send a bodiless error response"""
+        writer.write(
+            f'HTTP/1.1 {status}\r\nContent-Length: 0\r\n'
+            f'Access-Control-Allow-Origin: {self.allow_origin}\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
@@ -4,8 +4,28 @@ Provides interchangeable search strategies (CategorySearch, LocationSearch)
 """
 
 from abc import ABC, abstractmethod
-from typing import List
-import math
+from typing import List, Optional
+import re
+
+from .geo import haversine_distance
+
+def build_fts_match(query: str) -> Optional[str]:
+    """
+    Build an SQLite FTS5 MATCH expression from free-text user input
+
+    Every word becomes a quoted prefix term, so "food ban" matches
+    "Food Bank" and user input can never inject FTS5 query syntax.
+
+    Args:
+        query (str): Raw search text
+
+    Returns:
+        str: MATCH expression, or None if the query has no searchable words
+    """
+    words = re.findall(r'\w+', query.lower())
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
 
 class SearchStrategy(ABC):
     """Abstract base class for search strategies"""
@@ -149,24 +169,7 @@ class LocationBasedSearch(SearchStrategy):
     
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points using Haversine formula"""
-        R = 6371  # Earth's radius in kilometers
-        
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
-        
-        a = (math.sin(dlat/2) * math.sin(dlat/2) +
-             math.cos(lat1_rad) * math.cos(lat2_rad) *
-             math.sin(dlon/2) * math.sin(dlon/2))
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-        
-        return distance
+        return haversine_distance(lat1, lon1, lat2, lon2)
 
 class CombinedSearch(SearchStrategy):
     """Search strategy that combines multiple search criteria"""
@@ -3,12 +3,19 @@ Singleton Pattern Implementation for Service Registry
 Manages the ServiceRegistry - a centralized component for all public services
 """
 
+import threading
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 
 class Service:
     """Service entity class"""
     
+    # Attributes copied from a database record by from_record()
+    RECORD_FIELDS = (
+        'id', 'latitude', 'longitude', 'phone', 'email', 'hours', 'rating',
+        'is_approved', 'is_rejected', 'is_held', 'created_at'
+    )
+    
     def __init__(self, name, category, description, address, provider_id):
         self.id = None
         self.name = name
@@ -23,13 +30,42 @@ class Service:
         self.rating = 0.0
         self.provider_id = provider_id
         self.is_approved = False
+        self.is_rejected = False
+        self.is_held = False
         self.created_at = datetime.utcnow()
         self.reviews = []
+    
+    @classmethod
+    def from_record(cls, record) -> 'Service':
+        """
+        Build a detached Service from a database record
+        
+        Args:
+            record: Object with the same attributes, e.g. a ServiceModel row
+            
+        Returns:
+            Service: Plain copy that is safe to keep outside the DB session
+        """
+        service = cls(record.name, record.category, record.description, record.address, record.provider_id)
+        for field in cls.RECORD_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                setattr(service, field, value)
+        return service
+    
+    @property
+    def is_visible(self) -> bool:
+        """Whether the service is shown to the public (approved and not on hold)"""
+        return bool(self.is_approved) and not self.is_held
 
 class ServiceRegistry:
     """
     Singleton class for managing all public services
     Ensures only one instance exists throughout the application
+    
+    Acts as an in-memory read model of the service catalogue: services are
+    stored by id with secondary indexes by category, provider and public
+    visibility, so lookups never scan the whole catalogue.
     """
     
     _instance = None
@@ -38,7 +74,12 @@ class ServiceRegistry:
         if ServiceRegistry._instance is not None:
             raise Exception("This class is a singleton!")
         
-        self.services = []
+        self._services: Dict[int, Service] = {}
+        self._by_category: Dict[str, Set[int]] = {}
+        self._by_provider: Dict[int, Set[int]] = {}
+        self._visible_ids: Set[int] = set()
+        self._next_id = 1
+        self._lock = threading.RLock()
         self._observers = []
         ServiceRegistry._instance = self
     
@@ -49,6 +90,22 @@ class ServiceRegistry:
             ServiceRegistry()
         return ServiceRegistry._instance
     
+    def load(self, services: Iterable[Service]):
+        """
+        Replace the registry contents, e.g. when hydrating from the database
+        
+        Args:
+            services (Iterable[Service]): Services with ids already assigned
+        """
+        with self._lock:
+            self._services.clear()
+            self._by_category.clear()
+            self._by_provider.clear()
+            self._visible_ids.clear()
+            self._next_id = 1
+            for service in services:
+                self._index(service)
+    
     def add_service(self, service: Service) -> bool:
         """
         Add a new service to the registry
@@ -59,12 +116,31 @@ class ServiceRegistry:
         Returns:
             bool: True if service was added successfully
         """
-        if service not in self.services:
-            service.id = len(self.services) + 1
-            self.services.append(service)
+        with self._lock:
+            if service.id is not None and service.id in self._services:
+                return False
+            if service.id is None:
+                service.id = self._next_id
+            self._index(service)
+        self._notify_observers(f"New service added: {service.name}")
+        return True
+    
+    def upsert_service(self, service: Service):
+        """
+        Insert a service or replace the stored copy with the same id
+        
+        Args:
+            service (Service): The service to store (must have an id)
+        """
+        with self._lock:
+            existing = self._services.get(service.id)
+            if existing is not None:
+                self._unindex(existing)
+            self._index(service)
+        if existing is not None:
+            self._notify_observers(f"Service updated: {service.name}")
+        else:
             self._notify_observers(f"New service added: {service.name}")
-            return True
-        return False
     
     def remove_service(self, service_id: int) -> bool:
         """
@@ -76,12 +152,13 @@ class ServiceRegistry:
         Returns:
             bool: True if service was removed successfully
         """
-        for i, service in enumerate(self.services):
-            if service.id == service_id:
-                removed_service = self.services.pop(i)
-                self._notify_observers(f"Service removed: {removed_service.name}")
-                return True
-        return False
+        with self._lock:
+            removed_service = self._services.get(service_id)
+            if removed_service is None:
+                return False
+            self._unindex(removed_service)
+        self._notify_observers(f"Service removed: {removed_service.name}")
+        return True
     
     def get_service(self, service_id: int) -> Optional[Service]:
         """
@@ -93,10 +170,7 @@ class ServiceRegistry:
         Returns:
             Service: The service if found, None otherwise
         """
-        for service in self.services:
-            if service.id == service_id:
-                return service
-        return None
+        return self._services.get(service_id)
     
     def get_services(self) -> List[Service]:
         """
@@ -105,7 +179,8 @@ class ServiceRegistry:
         Returns:
             List[Service]: List of all services
         """
-        return self.services.copy()
+        with self._lock:
+            return list(self._services.values())
     
     def get_services_by_category(self, category: str) -> List[Service]:
         """
@@ -117,16 +192,31 @@ class ServiceRegistry:
         Returns:
             List[Service]: List of services in the specified category
         """
-        return [service for service in self.services if service.category.lower() == category.lower()]
+        with self._lock:
+            return [self._services[service_id] for service_id in self._by_category.get(category.lower(), ())]
+    
+    def get_services_by_provider(self, provider_id: int) -> List[Service]:
+        """
+        Get services owned by a provider
+        
+        Args:
+            provider_id (int): ID of the provider
+            
+        Returns:
+            List[Service]: List of the provider's services
+        """
+        with self._lock:
+            return [self._services[service_id] for service_id in self._by_provider.get(provider_id, ())]
     
     def get_approved_services(self) -> List[Service]:
         """
-        Get only approved services
+        Get only approved services that are not on hold
         
         Returns:
-            List[Service]: List of approved services
+            List[Service]: List of publicly visible services
         """
-        return [service for service in self.services if service.is_approved]
+        with self._lock:
+            return [self._services[service_id] for service_id in self._visible_ids]
     
     def approve_service(self, service_id: int) -> bool:
         """
@@ -138,12 +228,7 @@ class ServiceRegistry:
         Returns:
             bool: True if service was approved successfully
         """
-        service = self.get_service(service_id)
-        if service:
-            service.is_approved = True
-            self._notify_observers(f"Service approved: {service.name}")
-            return True
-        return False
+        return self.update_service(service_id, is_approved=True)
     
     def update_service(self, service_id: int, **kwargs) -> bool:
         """
@@ -156,14 +241,41 @@ class ServiceRegistry:
         Returns:
             bool: True if service was updated successfully
         """
-        service = self.get_service(service_id)
-        if service:
+        with self._lock:
+            service = self._services.get(service_id)
+            if service is None:
+                return False
+            self._unindex(service)
             for key, value in kwargs.items():
                 if hasattr(service, key):
                     setattr(service, key, value)
+            self._index(service)
+        if kwargs.get('is_approved'):
+            self._notify_observers(f"Service approved: {service.name}")
+        else:
             self._notify_observers(f"Service updated: {service.name}")
-            return True
-        return False
+        return True
+    
+    def _index(self, service: Service):
+        """Store a service and add it to every secondary index (caller holds the lock)"""
+        self._services[service.id] = service
+        self._by_category.setdefault((service.category or '').lower(), set()).add(service.id)
+        self._by_provider.setdefault(service.provider_id, set()).add(service.id)
+        if service.is_visible:
+            self._visible_ids.add(service.id)
+        self._next_id = max(self._next_id, service.id + 1)
+    
+    def _unindex(self, service: Service):
+        """Remove a service from storage and every secondary index (caller holds the lock)"""
+        self._services.pop(service.id, None)
+        for index, key in ((self._by_category, (service.category or '').lower()),
+                           (self._by_provider, service.provider_id)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(service.id)
+                if not ids:
+                    del index[key]
+        self._visible_ids.discard(service.id)
     
     def add_observer(self, observer):
         """Add an observer to be notified of changes"""
@@ -188,14 +300,15 @@ class ServiceRegistry:
         Returns:
             dict: Statistics about services
         """
-        total_services = len(self.services)
-        approved_services = len(self.get_approved_services())
-        categories = set(service.category for service in self.services)
+        services = self.get_services()
+        total_services = len(services)
+        approved_services = sum(1 for service in services if service.is_approved)
+        categories = set(service.category for service in services)
         
         return {
             'total_services': total_services,
             'approved_services': approved_services,
             'pending_services': total_services - approved_services,
             'categories': list(categories),
-            'average_rating': sum(service.rating for service in self.services) / total_services if total_services > 0 else 0
+            'average_rating': sum(service.rating or 0.0 for service in services) / total_services if total_services > 0 else 0
         } 
\ No newline at end of file
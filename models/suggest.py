@@ -0,0 +1,202 @@
+"""
+Prefix index for search suggestions
+Keeps service names, categories and address localities in a sorted array so
+typeahead lookups are a binary search followed by a short contiguous scan
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_NON_WORD = re.compile(r'[^\w]+')
+_DIGITS = re.compile(r'\d+')
+
+def normalize_text(value: str) -> str:
+    """Lowercase, strip accents and collapse punctuation to single spaces"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return _NON_WORD.sub(' ', value.casefold()).strip()
+
+def address_localities(address: str) -> List[str]:
+    """
+    Extract the localities of an address
+
+    The first comma-separated part is taken to be the street; the remaining
+    parts with postcodes removed are returned, e.g. "Kuala Lumpur" and
+    "Malaysia" for "123 Jalan Tun Razak, 50400 Kuala Lumpur, Malaysia".
+    """
+    localities = []
+    for part in (address or '').split(',')[1:]:
+        locality = ' '.join(_DIGITS.sub(' ', part).split())
+        if locality and locality not in localities:
+            localities.append(locality)
+    return localities
+
+class SuggestIndex:
+    """
+    In-memory typeahead index over publicly visible services
+
+    Every indexed phrase is stored once per word it starts at ("food bank",
+    "bank"), so a prefix also matches words inside a name. The keys live in
+    a sorted list: a lookup bisects to the first key with the prefix and
+    scans forward while keys still start with it. Category and locality
+    terms are shared between services and ranked by how many use them;
+    service names are ranked by review count.
+    """
+
+    KINDS = ('services', 'categories', 'localities')
+
+    def __init__(self, max_scan: int = 2000):
+        """
+        Initialize the index
+
+        Args:
+            max_scan (int): Most keys examined per lookup, bounding the cost of
+                one- and two-letter prefixes on large catalogues
+        """
+        self.max_scan = max_scan
+        self._keys: List[str] = []
+        self._refs: List[Tuple[Tuple[str, object], bool]] = []  # (term, key starts the label) per key
+        self._labels: Dict[Tuple[str, object], str] = {}
+        self._weights: Dict[Tuple[str, object], int] = {}
+        self._services: Dict[int, Tuple[Tuple[str, object], ...]] = {}
+        self._lock = threading.Lock()
+        self.is_loaded = False
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def load(self, services: Iterable[Tuple[int, str, str, str, int]]):
+        """
+        Replace the index contents
+
+        Args:
+            services: Iterable of (service_id, name, category, address, review_count) tuples
+        """
+        with self._lock:
+            self._labels, self._weights, self._services = {}, {}, {}
+            entries = []
+            for service in services:
+                for term in self._add_terms(*service):
+                    entries.extend((key, (term, index == 0)) for index, key in enumerate(self._term_keys(term)))
+            entries.sort(key=lambda entry: entry[0])
+            self._keys = [key for key, _ in entries]
+            self._refs = [ref for _, ref in entries]
+            self.is_loaded = True
+
+    def upsert(self, service_id: int, name: str, category: str, address: str, review_count: int = 0):
+        """Add a service or replace its indexed name, category and address"""
+        with self._lock:
+            self._discard(service_id)
+            for term in self._add_terms(service_id, name, category, address, review_count):
+                self._insert_keys(term)
+
+    def remove(self, service_id: int) -> bool:
+        """
+        Remove a service
+
+        Returns:
+            bool: True if the service was indexed
+        """
+        with self._lock:
+            return self._discard(service_id)
+
+    def suggest(self, prefix: str, limit: int = 5) -> Dict[str, List[Dict]]:
+        """
+        Get the best suggestions for a typed prefix
+
+        Args:
+            prefix (str): Text typed so far; the last word may be incomplete
+            limit (int): Maximum suggestions per kind
+
+        Returns:
+            Dict: 'services' ({'id', 'name'}), 'categories' and 'localities'
+                  ({'name', 'count'}) lists, best first
+        """
+        prefix = normalize_text(prefix)
+        results = {kind: [] for kind in self.KINDS}
+        if not prefix:
+            return results
+
+        with self._lock:
+            # Best match per term: phrases starting the whole label outrank inner words
+            matches: Dict[Tuple[str, object], int] = {}
+            position = bisect_left(self._keys, prefix)
+            end = min(len(self._keys), position + self.max_scan)
+            while position < end and self._keys[position].startswith(prefix):
+                term, starts_label = self._refs[position]
+                if matches.get(term, 0) < 1 + starts_label:
+                    matches[term] = 1 + starts_label
+                position += 1
+
+            grouped: Dict[str, List] = {kind: [] for kind in self.KINDS}
+            for term, quality in matches.items():
+                grouped[term[0]].append((quality, self._weights[term], term))
+            for kind, candidates in grouped.items():
+                for quality, weight, term in heapq.nlargest(limit, candidates, key=lambda c: (c[0], c[1])):
+                    if kind == 'services':
+                        results[kind].append({'id': term[1], 'name': self._labels[term]})
+                    else:
+                        results[kind].append({'name': self._labels[term], 'count': weight})
+        return results
+
+    def _term_keys(self, term: Tuple[str, object]) -> List[str]:
+        """Keys of a term: its normalized label from each word onwards"""
+        words = normalize_text(self._labels[term]).split()
+        return [' '.join(words[index:]) for index in range(len(words))]
+
+    def _add_terms(self, service_id: int, name: str, category: str, address: str,
+                   review_count: Optional[int]) -> List[Tuple[str, object]]:
+        """
+        Record a service's terms and weights (caller holds the lock)
+
+        Returns:
+            List: Terms not indexed before, whose keys the caller must insert
+        """
+        terms = [('services', service_id)]
+        self._labels[terms[0]] = name or ''
+        self._weights[terms[0]] = review_count or 0
+        shared = [('categories', category)] + [('localities', locality) for locality in address_localities(address)]
+        for kind, label in shared:
+            if not normalize_text(label):
+                continue
+            term = (kind, normalize_text(label))
+            if term in terms:
+                continue
+            terms.append(term)
+            self._labels.setdefault(term, label)
+            self._weights[term] = self._weights.get(term, 0) + 1
+        self._services[service_id] = tuple(terms)
+        return [term for term in terms if term[0] == 'services' or self._weights[term] == 1]
+
+    def _insert_keys(self, term: Tuple[str, object]):
+        for index, key in enumerate(self._term_keys(term)):
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._refs.insert(position, (term, index == 0))
+
+    def _delete_keys(self, term: Tuple[str, object]):
+        for key in self._term_keys(term):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._refs[position][0] == term:
+                    del self._keys[position]
+                    del self._refs[position]
+                    break
+                position += 1
+
+    def _discard(self, service_id: int) -> bool:
+        """Drop a service's terms, deleting keys no other service shares (caller holds the lock)"""
+        terms = self._services.pop(service_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            self._weights[term] -= 1
+            if term[0] == 'services' or self._weights[term] == 0:
+                self._delete_keys(term)
+                del self._weights[term]
+                del self._labels[term]
+        return True
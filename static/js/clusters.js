@@ -0,0 +1,97 @@
+/**
+ * Map clustering for the Public Service Locator
+ */
+
+/**
+ * Server-side clustered markers: fetches /api/clusters for the current viewport
+ * whenever the map moves, so the marker count is bounded by screen size
+ */
+class ClusterLayer {
+    constructor(map, url, options = {}) {
+        this.map = map;
+        this.url = url;
+        this.category = options.category || '';
+        this.colors = options.colors || {};
+        this.layer = L.layerGroup().addTo(map);
+        this.request = null;
+        this.map.on('moveend', () => this.refresh());
+    }
+
+    refresh() {
+        if (this.request) this.request.abort();
+        this.request = new AbortController();
+        const params = new URLSearchParams({
+            bbox: this.map.getBounds().toBBoxString(),
+            zoom: this.map.getZoom()
+        });
+        if (this.category) params.set('category', this.category);
+        fetch(`${this.url}?${params}`, { signal: this.request.signal })
+            .then(response => response.json())
+            .then(data => this.render(data.clusters))
+            .catch(error => {
+                if (error.name !== 'AbortError') console.error('Error loading clusters:', error);
+            });
+    }
+
+    render(clusters) {
+        this.layer.clearLayers();
+        clusters.forEach(cluster => {
+            const marker = cluster.count === 1 ? this.serviceMarker(cluster) : this.clusterMarker(cluster);
+            this.layer.addLayer(marker);
+        });
+    }
+
+    clusterMarker(cluster) {
+        const size = Math.min(60, 24 + Math.round(Math.log10(cluster.count) * 12));
+        const color = this.colors[this.category] || '#007bff';
+        const marker = L.marker([cluster.lat, cluster.lng], {
+            icon: L.divIcon({
+                className: 'cluster-marker',
+                html: `<div style="background-color: ${color}; color: white; width: ${size}px; height: ${size}px; line-height: ${size}px; border-radius: 50%; border: 3px solid white; box-shadow: 0 2px 5px rgba(0,0,0,0.3); text-align: center; font-weight: bold; font-size: 0.8em;">${cluster.count}</div>`,
+                iconSize: [size, size],
+                iconAnchor: [size / 2, size / 2]
+            })
+        });
+        marker.on('click', () => this.map.setView([cluster.lat, cluster.lng], this.map.getZoom() + 2));
+        return marker;
+    }
+
+    serviceMarker(cluster) {
+        const color = this.colors[this.category] || '#007bff';
+        const marker = L.marker([cluster.lat, cluster.lng], {
+            icon: L.divIcon({
+                className: 'custom-marker',
+                html: `<div style="background-color: ${color}; width: 20px; height: 20px; border-radius: 50%; border: 3px solid white; box-shadow: 0 2px 5px rgba(0,0,0,0.3);"></div>`,
+                iconSize: [20, 20],
+                iconAnchor: [10, 10]
+            })
+        });
+        // Details are fetched on demand; the cluster payload only carries the ID
+        marker.bindPopup('Loading...');
+        marker.on('popupopen', () => {
+            fetch(`/api/services?fields=id,name,address&after=${cluster.id - 1}&limit=1`)
+                .then(response => response.json())
+                .then(data => {
+                    const service = data.services[0];
+                    if (service && service.id === cluster.id) {
+                        marker.setPopupContent(this.popupContent(service));
+                    }
+                });
+        });
+        return marker;
+    }
+
+    popupContent(service) {
+        // Names and addresses are provider input, so they are set as text, never as HTML
+        const content = document.createElement('div');
+        const name = document.createElement('b');
+        name.textContent = service.name;
+        const address = document.createElement('div');
+        address.textContent = service.address;
+        const link = document.createElement('a');
+        link.href = `/service/${encodeURIComponent(service.id)}`;
+        link.textContent = 'Details';
+        content.append(name, address, link);
+        return content;
+    }
+}
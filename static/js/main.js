@@ -18,9 +18,44 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeSearchFunctionality();
     initializeFormValidation();
     initializeAnimations();
+    initializeLiveNotifications();
 
-    // Notification actions (mark as read/unread, delete, clear)
-    document.querySelectorAll('.notification-link').forEach(function(link) {
+    // Notification actions (mark as read/unread, delete)
+    bindNotificationActions(document);
+
+    // Clear all notifications
+    document.querySelectorAll('.clear-notifications-btn').forEach(function(btn) {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+            if(confirm('Clear all notifications?')) {
+                fetch('/notifications/clear', {method: 'POST'})
+                    .then(res => res.json())
+                    .then(data => { 
+                        if(data.success) {
+                            // Clear all notification items from dropdown
+                            const dropdown = document.querySelector('#notificationDropdown + .dropdown-menu');
+                            if (dropdown) {
+                                const items = dropdown.querySelectorAll('li:not(.dropdown-header):not(:last-child):not(:nth-last-child(2))');
+                                items.forEach(item => item.remove());
+                                // Add "No notifications" message
+                                const noNotifications = document.createElement('li');
+                                noNotifications.innerHTML = '<span class="dropdown-item text-muted">No notifications</span>';
+                                dropdown.insertBefore(noNotifications, dropdown.querySelector('.dropdown-divider'));
+                            }
+                            // Update notification count badge
+                            updateNotificationCount();
+                        }
+                    });
+            }
+        });
+    });
+});
+
+/**
+ * Bind mark read/unread and delete actions to the notification items under root
+ */
+function bindNotificationActions(root) {
+    root.querySelectorAll('.notification-link').forEach(function(link) {
         link.addEventListener('click', function(e) {
             const id = this.getAttribute('data-id');
             const markReadBtn = this.closest('li').querySelector('.mark-read-btn');
@@ -51,7 +86,7 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 
     // Mark as read/unread
-    document.querySelectorAll('.mark-read-btn').forEach(function(btn) {
+    root.querySelectorAll('.mark-read-btn').forEach(function(btn) {
         btn.addEventListener('click', function(e) {
             e.preventDefault();
             const id = btn.getAttribute('data-id');
@@ -78,7 +113,7 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     // Delete notification
-    document.querySelectorAll('.delete-notification-btn').forEach(function(btn) {
+    root.querySelectorAll('.delete-notification-btn').forEach(function(btn) {
         btn.addEventListener('click', function(e) {
             e.preventDefault();
             const id = btn.getAttribute('data-id');
@@ -97,33 +132,77 @@ document.addEventListener('DOMContentLoaded', function() {
                 });
         });
     });
-    // Clear all notifications
-    document.querySelectorAll('.clear-notifications-btn').forEach(function(btn) {
-        btn.addEventListener('click', function(e) {
-            e.preventDefault();
-            if(confirm('Clear all notifications?')) {
-                fetch('/notifications/clear', {method: 'POST'})
-                    .then(res => res.json())
-                    .then(data => { 
-                        if(data.success) {
-                            // Clear all notification items from dropdown
-                            const dropdown = document.querySelector('#notificationDropdown + .dropdown-menu');
-                            if (dropdown) {
-                                const items = dropdown.querySelectorAll('li:not(.dropdown-header):not(:last-child):not(:nth-last-child(2))');
-                                items.forEach(item => item.remove());
-                                // Add "No notifications" message
-                                const noNotifications = document.createElement('li');
-                                noNotifications.innerHTML = '<span class="dropdown-item text-muted">No notifications</span>';
-                                dropdown.insertBefore(noNotifications, dropdown.querySelector('.dropdown-divider'));
-                            }
-                            // Update notification count badge
-                            updateNotificationCount();
-                        }
-                    });
-            }
-        });
+}
+
+/**
+ * Stream new notifications into the dropdown as they are created (Observer Pattern)
+ */
+function initializeLiveNotifications() {
+    const bell = document.getElementById('notificationDropdown');
+    if (!bell || !bell.dataset.streamTokenUrl || !window.EventSource) return;
+    
+    function connect() {
+        fetch(bell.dataset.streamTokenUrl)
+            .then(res => res.ok ? res.json() : Promise.reject(res.status))
+            .then(data => {
+                const source = new EventSource(data.url);
+                source.addEventListener('notification', function(e) {
+                    const notification = JSON.parse(e.data);
+                    prependNotification(notification);
+                    showNotification(notification.message, 'info');
+                });
+                source.onerror = function() {
+                    // The browser retries dropped connections itself; a closed stream
+                    // (e.g. an expired token) needs a fresh token
+                    if (source.readyState === EventSource.CLOSED) {
+                        setTimeout(connect, 10000);
+                    }
+                };
+            })
+            .catch(() => {});
+    }
+    connect();
+}
+
+/**
+ * Insert a pushed notification at the top of the dropdown
+ */
+function prependNotification(notification) {
+    const dropdown = document.querySelector('#notificationDropdown + .dropdown-menu');
+    if (!dropdown) return;
+    
+    // Drop the "No notifications" placeholder
+    dropdown.querySelectorAll('li > span.text-muted').forEach(span => span.parentElement.remove());
+    
+    const item = document.createElement('li');
+    item.className = 'd-flex align-items-center';
+    item.innerHTML = `
+        <a class="dropdown-item py-2 flex-grow-1 d-flex flex-column fw-bold notification-link" data-id="${notification.id}">
+            <span class="notification-message"></span>
+            <span class="text-muted small mt-1" style="align-self: flex-end;"></span>
+        </a>
+        <button class="btn btn-link btn-sm mark-read-btn" data-id="${notification.id}" data-read="0" title="Mark as read/unread">
+            <i class="fas fa-envelope text-primary"></i>
+        </button>
+        <button class="btn btn-link btn-sm delete-notification-btn text-danger" data-id="${notification.id}" title="Delete notification">
+            <i class="fas fa-trash"></i>
+        </button>
+    `;
+    const link = item.querySelector('.notification-link');
+    link.href = notification.url || '#';
+    link.querySelector('.notification-message').textContent = notification.message;
+    link.querySelector('.small').textContent = new Date(notification.created_at + 'Z').toLocaleString([], {
+        month: 'short', day: '2-digit', hour: '2-digit', minute: '2-digit'
     });
-});
+    
+    const header = dropdown.querySelector('.dropdown-header');
+    const divider = document.createElement('li');
+    divider.innerHTML = '<hr class="dropdown-divider my-1">';
+    header.after(item, divider);
+    
+    bindNotificationActions(item);
+    updateNotificationCount();
+}
 
 /**
  * Initialize notification system (Observer Pattern demonstration)
@@ -183,6 +262,69 @@ function initializeSearchFunctionality() {
             console.log(`Search query: ${query}`);
         });
     }
+
+    const searchInput = document.querySelector('input[data-suggest-url]');
+    if (searchInput) {
+        initializeSearchSuggestions(searchInput);
+    }
+}
+
+/**
+ * Show typeahead suggestions under a search box as the user types
+ */
+function initializeSearchSuggestions(input) {
+    const menu = document.createElement('div');
+    menu.className = 'list-group position-absolute w-100 shadow-sm d-none';
+    menu.style.zIndex = 1050;
+    input.parentNode.classList.add('position-relative');
+    input.parentNode.appendChild(menu);
+
+    let timer = null;
+    let controller = null;
+    const hide = () => menu.classList.add('d-none');
+
+    const addItem = (label, detail, onSelect) => {
+        const item = document.createElement('button');
+        item.type = 'button';
+        item.className = 'list-group-item list-group-item-action d-flex justify-content-between';
+        item.innerHTML = `<span></span><small class="text-muted">${detail}</small>`;
+        item.firstChild.textContent = label;
+        // mousedown fires before the input's blur hides the menu
+        item.addEventListener('mousedown', e => { e.preventDefault(); onSelect(); });
+        menu.appendChild(item);
+    };
+
+    const render = data => {
+        menu.innerHTML = '';
+        data.services.forEach(s => addItem(s.name, 'Service', () => { window.location = `/service/${s.id}`; }));
+        data.categories.forEach(c => addItem(c.name, `Category · ${c.count}`, () => {
+            const select = document.getElementById('category');
+            if (select) { select.value = c.name; }
+            input.value = '';
+            input.form.submit();
+        }));
+        data.localities.forEach(l => addItem(l.name, `Area · ${l.count}`, () => {
+            input.value = l.name;
+            input.form.submit();
+        }));
+        menu.classList.toggle('d-none', !menu.children.length);
+    };
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const q = input.value.trim();
+        if (!q) { hide(); return; }
+        timer = setTimeout(() => {
+            if (controller) { controller.abort(); }
+            controller = new AbortController();
+            fetch(`${input.dataset.suggestUrl}?q=${encodeURIComponent(q)}`, {signal: controller.signal})
+                .then(res => res.json())
+                .then(render)
+                .catch(() => {});
+        }, 100);
+    });
+    input.addEventListener('blur', hide);
+    input.addEventListener('keydown', e => { if (e.key === 'Escape') { hide(); } });
 }
 
 /**
@@ -0,0 +1,34 @@
+"""
+Shared fixtures for the tests that need the Flask application
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Point the application at a throwaway database before any test module imports it
+_database_dir = tempfile.mkdtemp(prefix='services-test-')
+atexit.register(shutil.rmtree, _database_dir, ignore_errors=True)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(_database_dir, 'services.db'))
+
+@pytest.fixture(scope='session')
+def flask_app():
+    """The application with its schema migrated, and background workers kept off"""
+    from app import app, init_database
+    app.config.update(
+        TESTING=True,
+        OUTBOX_WORKER_IN_PROCESS=False,
+        NOTIFICATION_STREAM_ENABLED=False,
+        RESPONSE_CACHE_ENABLED=False
+    )
+    with app.app_context():
+        init_database()
+    return app
+
+@pytest.fixture
+def app_context(flask_app):
+    with flask_app.app_context():
+        yield flask_app
@@ -0,0 +1,56 @@
+"""
+Tests for the response cache in models/cache.py
+"""
+
+from models.cache import LocalLRUCache, ResponseCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LocalLRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+def test_entries_expire_after_ttl():
+    cache = LocalLRUCache(ttl=60)
+    cache.set('fresh', 1)
+    cache.set('stale', 2, ttl=0)
+    assert cache.get('fresh') == 1
+    assert cache.get('stale') is None
+    assert len(cache) == 1  # the expired entry was dropped when read
+
+def test_statistics_count_hits_and_misses():
+    cache = LocalLRUCache()
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    assert cache.get_statistics() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+def test_delete_and_clear():
+    cache = LocalLRUCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.delete('a')
+    assert cache.get('a') is None
+    cache.clear()
+    assert len(cache) == 0
+
+def test_bump_version_invalidates_cached_responses():
+    cache = ResponseCache(LocalLRUCache())
+    cache.set('/search?q=clinic', 'page')
+    assert cache.get('/search?q=clinic') == 'page'
+    assert cache.bump_version() == 1
+    assert cache.get('/search?q=clinic') is None
+    cache.set('/search?q=clinic', 'new page')
+    assert cache.get('/search?q=clinic') == 'new page'
+
+def test_response_rendered_before_a_bump_is_not_served_after_it():
+    cache = ResponseCache(LocalLRUCache())
+    version = cache.version
+    cache.bump_version()  # a write lands while the response is being rendered
+    cache.set('/api/services', 'stale', version=version)
+    assert cache.get('/api/services') is None
@@ -0,0 +1,71 @@
+"""
+Tests for the map clustering index in models/clustering.py
+"""
+
+import pytest
+
+from models.clustering import ClusterIndex
+
+WORLD = (-180.0, -85.0, 180.0, 85.0)
+KUALA_LUMPUR = (101.6, 3.0, 101.8, 3.2)
+
+@pytest.fixture
+def index():
+    index = ClusterIndex()
+    index.load([
+        (1, 3.14, 101.69, 'Health'),
+        (2, 3.15, 101.70, 'Food'),
+        (3, 3.16, 101.71, 'health'),
+        (4, 1.35, 103.82, 'Food'),  # Singapore
+        (5, None, None, 'Food')     # no coordinates: not indexed
+    ])
+    return index
+
+def test_services_merge_into_one_cluster_at_low_zoom(index):
+    clusters = index.clusters(KUALA_LUMPUR, 5)
+    assert len(clusters) == 1
+    cluster = clusters[0]
+    assert cluster['count'] == 3
+    assert cluster['lat'] == pytest.approx(3.15)
+    assert cluster['lng'] == pytest.approx(101.70)
+    assert 'id' not in cluster
+
+def test_single_service_cells_report_the_service_id(index):
+    clusters = index.clusters(KUALA_LUMPUR, 16)
+    assert sorted(cluster['id'] for cluster in clusters) == [1, 2, 3]
+    assert all(cluster['count'] == 1 for cluster in clusters)
+
+def test_category_filter_is_case_insensitive(index):
+    clusters = index.clusters(KUALA_LUMPUR, 5, category='HEALTH')
+    assert [cluster['count'] for cluster in clusters] == [2]
+    assert index.clusters(KUALA_LUMPUR, 5, category='Shelter') == []
+
+def test_upsert_moves_and_remove_subtracts(index):
+    index.upsert(4, 3.15, 101.70, 'Food')
+    assert sum(cluster['count'] for cluster in index.clusters(KUALA_LUMPUR, 5)) == 4
+    assert index.remove(4) is True
+    assert index.remove(4) is False
+    assert sum(cluster['count'] for cluster in index.clusters(KUALA_LUMPUR, 5)) == 3
+    assert len(index) == 3
+
+def test_removing_every_service_leaves_no_empty_cells(index):
+    for service_id in (1, 2, 3, 4):
+        index.remove(service_id)
+    assert all(not level for level in index._levels)
+
+def test_viewport_crossing_the_antimeridian():
+    index = ClusterIndex()
+    index.load([(1, -17.7, 178.0, 'Food'), (2, -14.3, -170.7, 'Food'), (3, 0.0, 0.0, 'Food')])
+    clusters = index.clusters((170.0, -20.0, -165.0, -10.0), 6)
+    assert sorted(cluster['id'] for cluster in clusters) == [1, 2]
+
+def test_large_viewports_are_clustered_at_a_coarser_zoom():
+    index = ClusterIndex(max_cells=256)
+    index.load((i, (i % 140) - 70.0, (i % 360) - 180.0, 'Food') for i in range(5000))
+    zoom = index.effective_zoom(WORLD, 16)
+    assert zoom < 16
+    assert len(index.clusters(WORLD, 16)) <= 256
+    assert index.clusters(WORLD, 16) == index.clusters(WORLD, zoom)
+    assert sum(cluster['count'] for cluster in index.clusters(WORLD, 16)) == 5000
+    # A city-sized viewport keeps the requested zoom
+    assert index.effective_zoom(KUALA_LUMPUR, 12) == 12
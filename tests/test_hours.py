@@ -0,0 +1,76 @@
+"""
+Tests for the opening hours parser in models/hours.py
+"""
+
+from datetime import datetime
+
+import pytest
+
+from models.hours import (
+    MINUTES_PER_DAY, MINUTES_PER_WEEK, HoursFormatError, is_open, minute_of_week, parse_hours
+)
+
+def at(day, hour, minute=0):
+    """Minute of the week for a weekday (0 = Monday) and time"""
+    return day * MINUTES_PER_DAY + hour * 60 + minute
+
+def test_weekday_and_saturday_ranges():
+    assert parse_hours('Mon-Fri 9AM-5PM, Sat 10AM-2PM') == (
+        [(at(day, 9), at(day, 17)) for day in range(5)] + [(at(5, 10), at(5, 14))]
+    )
+
+def test_always_open():
+    intervals = parse_hours('24/7')
+    assert intervals == [(at(day, 0), at(day, 0) + MINUTES_PER_DAY) for day in range(7)]
+    assert parse_hours('Open 24 hours') == intervals
+
+def test_hours_without_days_apply_every_day():
+    assert parse_hours('8:30-17:00') == [(at(day, 8, 30), at(day, 17)) for day in range(7)]
+
+def test_day_groups():
+    assert parse_hours('Weekdays 9AM-5PM') == [(at(day, 9), at(day, 17)) for day in range(5)]
+    assert parse_hours('Weekends 10AM-2PM') == [(at(day, 10), at(day, 14)) for day in (5, 6)]
+    assert parse_hours('Daily 7AM-7PM') == parse_hours('Every day 7AM-7PM')
+
+def test_wrapping_day_range():
+    assert [opens // MINUTES_PER_DAY for opens, _ in parse_hours('Fri-Mon 9AM-5PM')] == [0, 4, 5, 6]
+
+def test_noon_and_midnight():
+    assert parse_hours('Mon noon-midnight') == [(at(0, 12), at(1, 0))]
+
+def test_overnight_slot_is_split_at_midnight():
+    assert parse_hours('Fri 10PM-2AM') == [(at(4, 22), at(5, 0)), (at(5, 0), at(5, 2))]
+
+def test_sunday_overnight_slot_wraps_to_monday():
+    assert parse_hours('Sun 10PM-2AM') == [(at(0, 0), at(0, 2)), (at(6, 22), MINUTES_PER_WEEK)]
+
+def test_24_hour_clock_overnight():
+    assert parse_hours('Sat 22:00-02:00') == [(at(5, 22), at(6, 0)), (at(6, 0), at(6, 2))]
+    assert parse_hours('Sat 22-2') == parse_hours('Sat 22:00-02:00')
+
+def test_start_takes_meridiem_of_end():
+    assert parse_hours('Mon 9-5PM') == [(at(0, 9), at(0, 17))]
+    assert parse_hours('Mon 11-1PM') == [(at(0, 11), at(0, 13))]
+
+def test_bare_range_is_read_as_12_hour_time():
+    assert parse_hours('Mon-Fri 9-5') == parse_hours('Mon-Fri 9AM-5PM')
+    assert parse_hours('Mon 11:30-1') == [(at(0, 11, 30), at(0, 13))]
+    assert not is_open(parse_hours('9-5'), at(2, 3))
+
+def test_overlapping_slots_are_merged():
+    assert parse_hours('Mon 9AM-1PM, Mon 12PM-5PM') == [(at(0, 9), at(0, 17))]
+
+def test_closed_days_only():
+    assert parse_hours('Closed') == []
+
+@pytest.mark.parametrize('text', ['', '   ', 'By appointment', 'Mon 13PM-5PM', 'Mon 9AM-25:00', 'Mon-Fri'])
+def test_unrecognized_hours_raise(text):
+    with pytest.raises(HoursFormatError):
+        parse_hours(text)
+
+def test_minute_of_week_and_is_open():
+    intervals = parse_hours('Mon-Fri 9AM-5PM')
+    assert minute_of_week(datetime(2024, 1, 3, 10, 30)) == at(2, 10, 30)  # a Wednesday
+    assert is_open(intervals, at(2, 10, 30))
+    assert not is_open(intervals, at(2, 17))
+    assert not is_open(intervals, at(5, 10))
@@ -0,0 +1,87 @@
+"""
+Tests for bulk service imports: models/importer.py and import_services in app.py
+"""
+
+import io
+import json
+
+import pytest
+
+from models.importer import ImportReport, ImportRowError, chunked, read_records, validate_service
+
+VALID = {'name': ' Klinik Desa ', 'category': 'Health', 'address': '1 Jalan Besar, Kajang',
+         'lat': '2.99', 'lng': '101.79'}
+
+def test_validate_service_normalizes_a_record():
+    service = validate_service(dict(VALID, Phone='03-1234'))
+    assert service['name'] == 'Klinik Desa'
+    assert service['category'] == 'health'
+    assert (service['latitude'], service['longitude']) == (2.99, 101.79)
+    assert service['phone'] == '03-1234'
+    assert service['email'] is None
+
+@pytest.mark.parametrize('change, reason', [
+    ({'name': ''}, 'Missing name'),
+    ({'lat': None, 'lng': ''}, 'Missing latitude, longitude'),
+    ({'lat': 'north'}, 'latitude is not a number'),
+    ({'lng': 'nan'}, 'longitude is not a finite number'),
+    ({'lat': '91'}, 'Coordinates are out of range'),
+    ({'name': 'x' * 101}, 'name is longer than 100 characters')
+])
+def test_validate_service_rejects_bad_records(change, reason):
+    with pytest.raises(ImportRowError, match=reason):
+        validate_service(dict(VALID, **change))
+
+def test_validate_service_rejects_non_objects():
+    with pytest.raises(ImportRowError):
+        validate_service(['not', 'an', 'object'])
+
+def test_read_records_csv_and_jsonl():
+    csv_stream = io.StringIO('name,category\nA,Food\nB,Health\n')
+    assert [(line, record['name']) for line, record in read_records(csv_stream, 'csv')] == [(2, 'A'), (3, 'B')]
+
+    jsonl_stream = io.StringIO('{"name": "A"}\n\nnot json\n')
+    records = list(read_records(jsonl_stream, 'jsonl'))
+    assert records[0] == (1, {'name': 'A'})
+    assert records[1][0] == 3 and isinstance(records[1][1], ImportRowError)
+
+    with pytest.raises(ValueError):
+        list(read_records(io.StringIO(''), 'xml'))
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+def test_report_keeps_a_bounded_list_of_rejects():
+    report = ImportReport(max_rejects=1)
+    report.reject(2, 'Missing name')
+    report.reject(3, 'Missing name')
+    assert report.rejected == 2
+    assert report.to_dict()['rejects'] == [{'line': 2, 'reason': 'Missing name'}]
+
+def test_import_skips_duplicates_within_and_across_batches(app_context, monkeypatch):
+    from app import ServiceModel, import_services
+
+    monkeypatch.setitem(app_context.config, 'IMPORT_BATCH_SIZE', 2)
+    rows = [
+        dict(VALID, name='Import Dedupe A'),
+        dict(VALID, name='import dedupe a'),                   # same batch, same name and place
+        dict(VALID, name='Import Dedupe A', lat='2.990001'),  # next batch, within the tolerance
+        dict(VALID, name='Import Dedupe A', lat='3.5'),       # same name elsewhere
+        dict(VALID, name='')
+    ]
+    stream = io.StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+    report = ImportReport()
+    import_services(read_records(stream, 'jsonl'), report)
+
+    assert (report.read, report.inserted, report.duplicates, report.rejected) == (5, 2, 2, 1)
+    assert report.rejects == [{'line': 5, 'reason': 'Missing name'}]
+    imported = ServiceModel.query.filter(ServiceModel.name.ilike('import dedupe a')).all()
+    assert sorted(service.latitude for service in imported) == [2.99, 3.5]
+    assert not any(service.is_approved for service in imported)
+
+    # Importing the same file again finds every valid row already present
+    report = ImportReport()
+    stream.seek(0)
+    import_services(read_records(stream, 'jsonl'), report)
+    assert (report.inserted, report.duplicates) == (0, 4)
@@ -0,0 +1,113 @@
+"""
+Tests for the versioned migration runner in models/migrations.py
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from models.migrations import MigrationRunner
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+def make_runner(log, fail_at=None):
+    """
+    Runner with three migrations registered out of order; version 2 backfills
+    item.doubled in batches and raises at row fail_at, if given
+    """
+    runner = MigrationRunner()
+
+    @runner.migration(3, 'Index doubled values')
+    def add_index(connection):
+        log.append(3)
+        connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_item_doubled ON item (doubled)')
+
+    @runner.migration(1, 'Create the item table')
+    def create_items(connection):
+        log.append(1)
+        connection.exec_driver_sql('CREATE TABLE IF NOT EXISTS item (id INTEGER PRIMARY KEY, value INTEGER)')
+        connection.exec_driver_sql('INSERT INTO item (value) SELECT value FROM seed')
+
+    @runner.migration(2, 'Add item.doubled')
+    def add_doubled(connection):
+        log.append(2)
+        columns = [row[1] for row in connection.exec_driver_sql('PRAGMA table_info(item)')]
+        if 'doubled' not in columns:
+            connection.exec_driver_sql('ALTER TABLE item ADD COLUMN doubled INTEGER')
+
+    @runner.backfill(2)
+    def fill_doubled(connection, position, batch_size):
+        ids = [row[0] for row in connection.execute(
+            text('SELECT id FROM item WHERE id > :position ORDER BY id LIMIT :limit'),
+            {'position': position, 'limit': batch_size}
+        )]
+        if not ids:
+            return None
+        if fail_at is not None and fail_at in ids:
+            raise RuntimeError('interrupted')
+        log.append(('batch', ids[0]))
+        connection.execute(
+            text('UPDATE item SET doubled = value * 2 WHERE id BETWEEN :first AND :last'),
+            {'first': ids[0], 'last': ids[-1]}
+        )
+        return ids[-1]
+
+    return runner
+
+@pytest.fixture(autouse=True)
+def seed_values(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE seed (value INTEGER)')
+        connection.exec_driver_sql(
+            'INSERT INTO seed (value) VALUES ' + ', '.join(f'({value})' for value in range(1, 11))
+        )
+
+def states(runner, engine):
+    return {state['version']: state['state'] for state in runner.status(engine)}
+
+def test_migrations_apply_in_version_order(engine):
+    log = []
+    runner = make_runner(log)
+    assert runner.head == 3
+    assert states(runner, engine) == {1: 'pending', 2: 'pending', 3: 'pending'}
+    assert runner.upgrade(engine, batch_size=4) == [1, 2, 3]
+    assert log == [1, 2, ('batch', 1), ('batch', 5), ('batch', 9), 3]
+    assert states(runner, engine) == {1: 'applied', 2: 'applied', 3: 'applied'}
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql('SELECT sum(doubled) FROM item').scalar() == 110
+
+def test_upgrade_stops_at_target_and_is_a_no_op_when_current(engine):
+    log = []
+    runner = make_runner(log)
+    assert runner.upgrade(engine, target=1) == [1]
+    assert runner.upgrade(engine) == [2, 3]
+    # A second process starting later finds nothing to do
+    assert make_runner(log).upgrade(engine) == []
+    assert log.count(1) == 1 and log.count(2) == 1
+
+def test_interrupted_backfill_resumes_from_its_stored_position(engine):
+    log = []
+    with pytest.raises(RuntimeError):
+        make_runner(log, fail_at=6).upgrade(engine, batch_size=2)
+    assert states(make_runner([]), engine) == {1: 'applied', 2: 'backfilling', 3: 'pending'}
+
+    log.clear()
+    assert make_runner(log).upgrade(engine, batch_size=2) == [2, 3]
+    # The upgrade step is not re-run and the committed batches are not repeated
+    assert log == [('batch', 5), ('batch', 7), ('batch', 9), 3]
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql('SELECT count(*) FROM item WHERE doubled = value * 2').scalar() == 10
+
+def test_idempotent_upgrades_bring_an_unversioned_database_up_to_date(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE item (id INTEGER PRIMARY KEY, value INTEGER, doubled INTEGER)')
+    assert make_runner([]).upgrade(engine) == [1, 2, 3]
+
+def test_duplicate_versions_are_rejected():
+    runner = MigrationRunner()
+    runner.migration(1, 'First')(lambda connection: None)
+    with pytest.raises(ValueError):
+        runner.migration(1, 'Again')(lambda connection: None)
@@ -0,0 +1,92 @@
+"""
+Tests for claiming and draining the notification outbox in app.py
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import (
+    Notification, NotificationOutbox, User, claim_outbox_events, create_notifications, db,
+    drain_notification_outbox, notification_service
+)
+
+@pytest.fixture
+def recipient(app_context):
+    """A user with an empty outbox and notification list"""
+    NotificationOutbox.query.delete()
+    user = User(username='outbox-recipient', email='outbox-recipient@example.com', role='general')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    yield user.id
+    NotificationOutbox.query.delete()
+    Notification.query.filter_by(user_id=user.id).delete()
+    User.query.filter_by(id=user.id).delete()
+    db.session.commit()
+
+def test_concurrent_drains_deliver_every_event_exactly_once(recipient, flask_app):
+    for number in range(300):
+        create_notifications(f'Outbox message {number}', user_ids=[recipient])
+    db.session.commit()
+
+    processed = []
+    start = threading.Barrier(4)
+
+    def drain():
+        with flask_app.app_context():
+            start.wait()
+            while True:
+                count = drain_notification_outbox(batch_size=23)
+                if not count:
+                    break
+                processed.append(count)
+
+    drainers = [threading.Thread(target=drain) for _ in range(4)]
+    for drainer in drainers:
+        drainer.start()
+    for drainer in drainers:
+        drainer.join()
+
+    assert sum(processed) == 300
+    assert NotificationOutbox.query.count() == 0
+    messages = [notification.message for notification in Notification.query.filter_by(user_id=recipient)]
+    assert sorted(messages) == sorted(f'Outbox message {number}' for number in range(300))
+
+def test_a_claimed_event_is_only_reclaimed_after_its_lease_expires(recipient, flask_app):
+    create_notifications('Leased message', user_ids=[recipient])
+    db.session.commit()
+    now = datetime.utcnow()
+
+    lease, events = claim_outbox_events(10, now)
+    assert [event.message for event in events] == ['Leased message']
+    assert claim_outbox_events(10, now) == (lease, [])
+
+    later = now + timedelta(seconds=flask_app.config['OUTBOX_CLAIM_TIMEOUT'] + 1)
+    takeover, events = claim_outbox_events(10, later)
+    assert takeover != lease
+    assert [event.message for event in events] == ['Leased message']
+    # The first drainer's lease no longer identifies the event
+    assert NotificationOutbox.query.filter_by(available_at=lease).count() == 0
+
+def test_failed_delivery_is_rescheduled_with_backoff(recipient):
+    class FailingChannel:
+        def update(self, message, data=None):
+            raise RuntimeError('gateway down')
+
+    create_notifications('Flaky message', user_ids=[recipient])
+    db.session.commit()
+    channel = FailingChannel()
+    notification_service.add_observer(channel)
+    try:
+        assert drain_notification_outbox(batch_size=10) == 1
+    finally:
+        notification_service.remove_observer(channel)
+
+    event = NotificationOutbox.query.one()
+    assert (event.attempts, event.last_error) == (1, 'gateway down')
+    assert event.available_at > datetime.utcnow()
+    assert Notification.query.filter_by(user_id=recipient).count() == 0
+    # Not due yet, so the next drain leaves it alone
+    assert drain_notification_outbox(batch_size=10) == 0
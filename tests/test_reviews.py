@@ -0,0 +1,69 @@
+"""
+Tests for keyset pagination of service reviews in app.py
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import (
+    Review, ServiceModel, User, db, decode_review_cursor, encode_review_cursor, load_review_page
+)
+
+@pytest.mark.parametrize('created_at', [datetime(2024, 5, 1, 9, 30), datetime(2024, 5, 1, 9, 30, 0, 123456)])
+def test_cursor_round_trip(created_at):
+    review = Review(id=42, created_at=created_at)
+    assert decode_review_cursor(encode_review_cursor(review)) == (created_at, 42)
+
+@pytest.mark.parametrize('cursor', ['', 'garbage', '2024-05-01T09:30:00_', 'not-a-date_7'])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_review_cursor(cursor)
+
+@pytest.fixture
+def reviewed_service(app_context):
+    """An approved service with seven reviews, three of them sharing a timestamp"""
+    user = User(username='cursor-reviewer', email='cursor-reviewer@example.com', role='general')
+    user.set_password('secret')
+    service = ServiceModel(name='Cursor Clinic', category='health', address='1 Jalan Ujian, Kajang',
+                           latitude=2.99, longitude=101.79, is_approved=True)
+    db.session.add_all([user, service])
+    db.session.flush()
+    start = datetime(2024, 5, 1, 9, 0)
+    stamps = [start, start + timedelta(minutes=1)] + [start + timedelta(minutes=2)] * 3 + \
+             [start + timedelta(minutes=3, microseconds=500), start + timedelta(minutes=4)]
+    reviews = [Review(service_id=service.id, user_id=user.id, rating=4, created_at=stamp) for stamp in stamps]
+    db.session.add_all(reviews)
+    db.session.commit()
+    yield service, reviews
+    for review in reviews:
+        db.session.delete(review)
+    db.session.delete(service)
+    db.session.delete(user)
+    db.session.commit()
+
+def test_pages_cover_every_review_once_newest_first(reviewed_service):
+    service, reviews = reviewed_service
+    expected = [review.id for review in sorted(reviews, key=lambda review: (review.created_at, review.id), reverse=True)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, next_cursor = load_review_page(service.id, cursor, limit=2)
+        seen.extend(review.id for review in page)
+        pages += 1
+        if next_cursor is None:
+            break
+        # The cursor travels through the API as text
+        cursor = decode_review_cursor(next_cursor)
+    assert seen == expected
+    assert pages == 4
+
+def test_api_rejects_an_invalid_cursor(reviewed_service, flask_app):
+    service, _ = reviewed_service
+    client = flask_app.test_client()
+    assert client.get(f'/api/services/{service.id}/reviews?cursor=garbage').status_code == 400
+    response = client.get(f'/api/services/{service.id}/reviews?limit=5')
+    assert len(response.get_json()['reviews']) == 5
+    next_page = client.get(f"/api/services/{service.id}/reviews?limit=5&cursor={response.get_json()['next_cursor']}")
+    assert len(next_page.get_json()['reviews']) == 2
+    assert next_page.get_json()['next_cursor'] is None
@@ -0,0 +1,61 @@
+"""
+Tests for the typeahead prefix index in models/suggest.py
+"""
+
+import pytest
+
+from models.suggest import SuggestIndex, address_localities, normalize_text
+
+@pytest.fixture
+def index():
+    index = SuggestIndex()
+    index.load([
+        (1, 'Central Food Bank', 'Food Bank', '1 Jalan Ampang, 50450 Kuala Lumpur, Malaysia', 3),
+        (2, 'Food Aid Centre', 'Food Bank', '2 Jalan Klang, Kuala Lumpur, Malaysia', 12),
+        (3, 'Fountain Clinic', 'Health', '3 Jalan SS2, Petaling Jaya, Malaysia', 40),
+        (4, 'Café Seafood Kitchen', 'Food Bank', '4 Jalan Tebrau, Johor Bahru, Malaysia', 0)
+    ])
+    return index
+
+def names(results):
+    return [suggestion['name'] for suggestion in results]
+
+def test_normalize_text_strips_accents_case_and_punctuation():
+    assert normalize_text('  Café—Seafood!! ') == 'cafe seafood'
+
+def test_address_localities_skip_street_and_postcodes():
+    assert address_localities('123 Jalan Tun Razak, 50400 Kuala Lumpur, Malaysia') == ['Kuala Lumpur', 'Malaysia']
+    assert address_localities('No commas here') == []
+
+def test_names_starting_with_the_prefix_outrank_inner_words(index):
+    # "Food Aid Centre" starts with the prefix; "Central Food Bank" only contains it
+    # and "Fountain Clinic" has more reviews but does not match "foo" at all
+    assert names(index.suggest('foo')['services']) == ['Food Aid Centre', 'Central Food Bank']
+
+def test_review_count_breaks_ties_between_equal_matches(index):
+    assert names(index.suggest('f')['services']) == ['Fountain Clinic', 'Food Aid Centre', 'Central Food Bank']
+
+def test_inner_words_and_accents_match(index):
+    assert names(index.suggest('seafo')['services']) == ['Café Seafood Kitchen']
+    assert names(index.suggest('cafe')['services']) == ['Café Seafood Kitchen']
+
+def test_categories_and_localities_are_counted_once_per_service(index):
+    results = index.suggest('k')
+    assert results['localities'] == [{'name': 'Kuala Lumpur', 'count': 2}]
+    assert index.suggest('food b')['categories'] == [{'name': 'Food Bank', 'count': 3}]
+
+def test_limit_and_empty_prefix(index):
+    assert len(index.suggest('jalan')['services']) == 0
+    assert len(index.suggest('f', limit=1)['services']) == 1
+    assert index.suggest('  ') == {'services': [], 'categories': [], 'localities': []}
+
+def test_upsert_and_remove_keep_shared_terms_counted(index):
+    index.upsert(2, 'Food Aid Centre', 'Shelter', '2 Jalan Klang, Kuala Lumpur, Malaysia', 12)
+    assert index.suggest('food b')['categories'] == [{'name': 'Food Bank', 'count': 2}]
+    assert index.suggest('shel')['categories'] == [{'name': 'Shelter', 'count': 1}]
+    assert index.remove(2) is True
+    assert index.remove(2) is False
+    assert index.suggest('shel')['categories'] == []
+    assert index.suggest('kuala')['localities'] == [{'name': 'Kuala Lumpur', 'count': 1}]
+    assert names(index.suggest('food')['services']) == ['Central Food Bank']
+    assert len(index) == 3